@@ -1,23 +1,482 @@
+import time
+_IMPORT_START = time.perf_counter()
+
 import pytest
 import os
+import sys
 from datetime import datetime
 from pytest_html import extras
+from utilities.reporting import StreamingReport, merge_shards
+from utilities.history import RunHistory, datetime_run_id
+from utilities.environment import start_local_endpoint
+from utilities.profiles import reset_browser_cache
+from utilities.visual import check_screenshots
+from utilities.performance import start_measurement, collect_metrics, check_budgets, read_budgets
+from utilities.network import NetworkCapture, drain_network_events
+from utilities.hang import HangWatchdog, CommandHangError, parse_command_timeouts
+from utilities.retry import FlakinessStats, RetryPolicy, page_state_reset
+from utilities.lazy import IMPORT_TIMINGS
+
+CONFTEST_IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("stream-report", "Streaming test report")
+    group.addoption("--stream-report-dir", default="reports/stream",
+                    help="Directory where each shard streams its results as JSON lines (default: reports/stream).")
+    group.addoption("--report-shard", default=None,
+                    help="Name of this shard's results file (default: the xdist worker id or 'main').")
+    group.addoption("--summary-html", default="reports/summary.html",
+                    help="Merged HTML report written at the end of the run.")
+    group.addoption("--summary-junit", default="reports/junit.xml",
+                    help="Merged JUnit XML report written at the end of the run.")
+
+    group = parser.getgroup("history", "Run history")
+    group.addoption("--history-db", default="reports/history.db",
+                    help="SQLite database that stores outcomes and timings of every run ('' to disable).")
+    group.addoption("--run-id", default=os.environ.get("TEST_RUN_ID"),
+                    help="Id shared by all shards of a run (default: $TEST_RUN_ID or a new timestamped id).")
+
+    group = parser.getgroup("remote", "Remote WebDriver")
+    group.addoption("--remote-url", default=os.environ.get("SELENIUM_REMOTE_URL"),
+                    help="W3C WebDriver endpoint to run the browser on (default: $SELENIUM_REMOTE_URL).")
+    group.addoption("--remote-local-endpoint", action="store_true",
+                    help="Start a local chromedriver and run the sessions against it as a remote endpoint.")
+    group.addoption("--remote-pool-size", type=int, default=32,
+                    help="Keep-alive connections kept per endpoint by the shared pool (default: 32).")
+
+    group = parser.getgroup("sweep", "Data-driven sweeps")
+    group.addoption("--sweep", action="store_true",
+                    help="Run the high-volume sweep tests (marked with @pytest.mark.sweep).")
+    group.addoption("--sweep-data", default="data/suggestion_sweep.csv",
+                    help="CSV file with the prefix,country cases of the suggestion sweep.")
+
+    group = parser.getgroup("performance", "Front-end performance")
+    group.addoption("--no-perf-metrics", action="store_true",
+                    help="Don't collect navigation, paint, long task and CDP metrics after each test.")
+    group.addoption("--perf-budgets", default="data/perf_budgets.csv",
+                    help="CSV file with the performance budgets (url,metric,max) that fail a test when exceeded.")
+
+    group.addoption("--network-log", action="store_true",
+                    help="Record network requests during each test, write a compact HAR per test and check network budgets.")
+    group.addoption("--har-dir", default="reports/har",
+                    help="Directory of the per-test HAR files (default: reports/har).")
+
+    group = parser.getgroup("watchdog", "Browser resource watchdog")
+    group.addoption("--recycle-every", type=int, default=0,
+                    help="Restart the browser session after this many tests (default: 0, never).")
+    group.addoption("--max-browser-rss", type=float, default=0,
+                    help="Restart the browser session when driver and browser use more memory than this, in MB.")
+    group.addoption("--max-windows", type=int, default=0,
+                    help="Restart the browser session when more windows than this are left open.")
+    group.addoption("--resource-curve", default="reports/resource_curve.csv",
+                    help="CSV file receiving the memory/CPU/handle samples taken between tests.")
+
+    group = parser.getgroup("hang", "WebDriver hang watchdog")
+    group.addoption("--command-timeout", type=float, default=60,
+                    help="Seconds a single WebDriver command may take before the session is killed (0 disables it).")
+    group.addoption("--command-timeouts", default="screenshot=30",
+                    help="Per-command deadlines, e.g. 'screenshot=30,getAlertText=10'.")
+    group.addoption("--test-timeout", type=float, default=0,
+                    help="Seconds a test may take before its session is killed (default: 0, no limit).")
+
+    group = parser.getgroup("retry", "Retries of transient failures")
+    group.addoption("--action-retries", type=int, default=1,
+                    help="Retries of an action failing with a transient error (timeout, stale element). Default: 1.")
+    group.addoption("--test-retries", type=int, default=0,
+                    help="Retries of a whole test failing with a transient error (default: 0).")
+    group.addoption("--retry-backoff", type=float, default=0.25,
+                    help="Seconds before the first retry, doubled for each further retry (capped at 2s).")
+
+    group = parser.getgroup("visual", "Visual regression")
+    group.addoption("--visual-check", action="store_true",
+                    help="Compare the screenshots taken during the run with the baselines in baselines/.")
+    group.addoption("--visual-masks", default=None,
+                    help="CSV file with regions to ignore in the visual check (name,x,y,width,height).")
+    group.addoption("--update-baselines", action="store_true",
+                    help="Accept changed screenshots as the new visual baselines.")
+
+    group = parser.getgroup("profile", "Warm browser profile")
+    group.addoption("--profile-template", default=None,
+                    help="Prime this user-data-dir once and start every browser from a clone of it instead of incognito.")
+    group.addoption("--profile-clone", default="auto", choices=("auto", "copy"),
+                    help="How the template is cloned per worker: copy-on-write with copy fallback, or always a copy.")
+
+
+def _runs_tests(config):
+    """
+    Tells whether this pytest invocation runs tests (not --collect-only, --fixtures...).
+    """
+    return not (config.option.collectonly or getattr(config.option, "showfixtures", False)
+                or getattr(config.option, "show_fixtures_per_test", False))
+
+
+def pytest_configure(config):
+    """
+    Registers the markers and sets up the watchdogs, budgets and remote endpoint of the run.
+    """
+    config.stream_report_started = time.time()
+    config.stream_report = None
+    config.addinivalue_line("markers", "requirement(id): requirement / RTM test case id covered by the test")
+    config.addinivalue_line("markers", "cold_cache: clear the browser cache (and cookies) before the test")
+    config.addinivalue_line("markers", "sweep: high-volume data-driven sweep, only run with --sweep")
+
+    # One run id for the whole run: the controller generates it and hands it to its xdist workers
+    config.run_history = None
+    if hasattr(config, "workerinput"):
+        config.run_id = config.workerinput.get("run_id") or config.getoption("--run-id")
+    else:
+        config.run_id = config.getoption("--run-id") or datetime_run_id()
+
+    config.resource_watchdog = None
+    config.flakiness_stats = FlakinessStats()
+    config.hang_watchdog = HangWatchdog(
+        command_timeout=config.getoption("--command-timeout"),
+        test_timeout=config.getoption("--test-timeout"),
+        command_timeouts=parse_command_timeouts(config.getoption("--command-timeouts")),
+    )
+    config.perf_budgets = read_budgets(config.getoption("--perf-budgets"))
+    config.pending_page_load = None  # Base page load of a new session, reported with the next test
+
+    # The local endpoint is started once, by the controller, and shared with its xdist workers
+    config.remote_service = None
+    config.remote_worker_stats = []
+    config.remote_url = config.getoption("--remote-url")
+    if hasattr(config, "workerinput"):
+        config.remote_url = config.remote_url or config.workerinput.get("remote_url")
+    if config.remote_url or config.getoption("--remote-local-endpoint"):
+        if config.getoption("--profile-template"):
+            # The clone lives on this host, and remote sessions have no CDP to reset the cache with
+            raise pytest.UsageError("--profile-template needs local browser sessions; "
+                                    "it can't be combined with --remote-url or --remote-local-endpoint.")
+        from utilities.remote import PooledRemoteConnection
+        PooledRemoteConnection.configure_pool(pool_size=config.getoption("--remote-pool-size"))
+    if config.getoption("--remote-local-endpoint") and not config.remote_url and not config.option.collectonly:
+        config.remote_service = start_local_endpoint()
+        config.remote_url = config.remote_service.service_url
+        config.hang_watchdog.endpoint = config.remote_service  # lets it kill the browsers of a hung session
+
+
+def pytest_sessionstart(session):
+    """
+    Opens this shard's streaming results file and the run history, only when tests actually
+    run, so that --markers, --fixtures or --collect-only never truncate the last run's reports
+    or register empty runs.
+    Each xdist worker streams to its own file, even when --report-shard is given.
+    """
+    config = session.config
+    if not _runs_tests(config):
+        return
+    shard = config.getoption("--report-shard")
+    worker = os.environ.get("PYTEST_XDIST_WORKER")
+    if shard and worker:
+        shard = f"{shard}-{worker}"
+    config.stream_report = StreamingReport(config.getoption("--stream-report-dir"), shard=shard or worker or "main")
+
+    # A distributing xdist controller records no results itself, so it does not register a run
+    distributing = not hasattr(config, "workerinput") and getattr(config.option, "dist", "no") != "no"
+    if config.getoption("--history-db") and not distributing:
+        config.run_history = RunHistory(config.getoption("--history-db"), run_id=config.run_id)
+        config.run_history.start_run()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """
+    Passes the run id and the remote endpoint of the controller to an xdist worker.
+    """
+    node.workerinput["run_id"] = node.config.run_id
+    node.workerinput["remote_url"] = node.config.remote_url
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """
+    Collects the remote WebDriver stats of a finished xdist worker for the terminal summary.
+    """
+    stats = getattr(node, "workeroutput", {}).get("remote_stats")
+    if stats:
+        node.config.remote_worker_stats.append(stats)
+
+
+def pytest_sessionfinish(session):
+    """
+    Hands the remote WebDriver stats of an xdist worker to the controller, then runs the visual
+    check over the screenshots of this run and fails the session on visual changes.
+    """
+    config = session.config
+    if hasattr(config, "workeroutput") and "utilities.remote" in sys.modules:
+        config.workeroutput["remote_stats"] = sys.modules["utilities.remote"].export_remote_stats()
+    if not config.getoption("--visual-check") or hasattr(config, "workerinput"):
+        return
+    if not os.path.isdir("screenshots"):
+        return
+    failed = check_screenshots(
+        "screenshots",
+        masks_file=config.getoption("--visual-masks"),
+        update=config.getoption("--update-baselines"),
+        since=config.stream_report_started,
+    )
+    if failed and not config.getoption("--update-baselines"):
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_unconfigure(config):
+    """
+    Stops the watchdogs and the local endpoint, closes the shard file and, on the
+    controlling process, merges the shards of this run.
+    """
+    if hasattr(config, "hang_watchdog"):
+        config.hang_watchdog.stop()
+    if getattr(config, "resource_watchdog", None):
+        config.resource_watchdog.save_curve(config.getoption("--resource-curve"))
+    if getattr(config, "remote_service", None):
+        config.remote_service.stop()
+    if getattr(config, "run_history", None):
+        config.run_history.finish_run()
+    stream_report = getattr(config, "stream_report", None)
+    if stream_report is None:
+        return
+    stream_report.close()
+    if not hasattr(config, "workerinput"):
+        merge_shards(
+            stream_report.output_dir,
+            html_path=config.getoption("--summary-html"),
+            junit_path=config.getoption("--summary-junit"),
+            since=config.stream_report_started,
+        )
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Skips the sweep tests unless --sweep is given.
+    """
+    if config.getoption("--sweep"):
+        return
+    skip_sweep = pytest.mark.skip(reason="sweep tests only run with --sweep")
+    for item in items:
+        if item.get_closest_marker("sweep"):
+            item.add_marker(skip_sweep)
+
+
+@pytest.fixture(autouse=True)
+def cold_cache(request):
+    """
+    Resets the browser cache before tests marked with @pytest.mark.cold_cache.
+    Remote sessions have no CDP access, so they are replaced by a fresh (incognito, cold) session instead.
+    """
+    if request.node.get_closest_marker("cold_cache"):
+        driver = request.getfixturevalue("driver")
+        if hasattr(driver.driver, "execute_cdp_cmd"):
+            reset_browser_cache(driver)
+        else:
+            driver.recycle("cold cache requested on a session without CDP access")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_collection(session):
+    """
+    Times test collection (reported in the terminal summary).
+    """
+    start = time.perf_counter()
+    try:
+        return (yield)
+    finally:
+        session.config.collection_seconds = time.perf_counter() - start
+
+
+def pytest_terminal_summary(terminalreporter):
+    """
+    Reports import and collection timings, connection reuse and per-command latency
+    of remote sessions, browser resources, flaky actions and hangs.
+    """
+    config = terminalreporter.config
+    terminalreporter.write_line(
+        f"[INFO] conftest imports {CONFTEST_IMPORT_SECONDS:.3f}s, "
+        f"collection {getattr(config, 'collection_seconds', 0):.3f}s"
+    )
+    for module, seconds in sorted(IMPORT_TIMINGS.items(), key=lambda item: item[1], reverse=True):
+        terminalreporter.write_line(f"[INFO]   lazily imported {module} in {seconds:.3f}s")
+    if config.remote_worker_stats or "utilities.remote" in sys.modules:
+        from utilities.remote import print_remote_stats
+        print_remote_stats(terminalreporter.write_line, worker_stats=config.remote_worker_stats)
+    for report in terminalreporter.getreports("passed") + terminalreporter.getreports("failed"):
+        sweep = dict(report.user_properties).get("sweep") if report.when == "call" else None
+        if sweep:
+            terminalreporter.write_line(
+                f"[INFO] {sweep['name']}: {sweep['cases']} cases, {sweep['failures']} failed in "
+                f"{sweep['seconds']:.2f}s ({sweep['throughput']:.1f} cases/s)"
+            )
+    watchdog = terminalreporter.config.resource_watchdog
+    if watchdog:
+        terminalreporter.write_line(f"[INFO] Browser resources: {watchdog.summary()}")
+    for scope, name, calls, recovered, retries in terminalreporter.config.flakiness_stats.summary():
+        terminalreporter.write_line(f"[WARN] Flaky {scope} {name}: retried {calls} time(s), recovered {recovered}")
+    for hang in terminalreporter.config.hang_watchdog.hangs:
+        terminalreporter.write_line(f"[FAIL] WebDriver hang in {hang['nodeid']}: {hang['reason']} ({hang['diagnostics']})")
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    """
+    Replaces a session killed by the hang watchdog, then samples the browser's resources
+    and lets the resource watchdog recycle the session when it crossed a limit.
+    Skipped after the last test, whose teardown has already quit the session.
+    """
+    result = yield
+    watchdog = item.config.resource_watchdog
+    hang = item.config.hang_watchdog.fired
+    if watchdog and "driver" in item.funcargs and nextitem is not None and not watchdog.handle.closed:
+        if hang:
+            watchdog.handle.recycle(f"WebDriver hang: {hang}")
+            item.config.hang_watchdog.fired = None
+        watchdog.after_test(item.nodeid)
+    return result
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """
+    Gives each test a list that collects the timings of the actions it runs, and
+    wraps the test in the retry policy when --test-retries is set.
+    """
+    item.action_timings = []
+    item.retry_events_start = len(item.config.flakiness_stats.events)
+    retries = item.config.getoption("--test-retries")
+    if retries:
+        policy = RetryPolicy(
+            retries=retries,
+            backoff=item.config.getoption("--retry-backoff"),
+            stats=item.config.flakiness_stats,
+        )
+        runtest = item.runtest
+
+        def run_with_retries():
+            # Remember the main window before the test can open any other
+            if "driver" in item.funcargs:
+                policy.reset = page_state_reset(item.funcargs["driver"])
+            return policy.run(runtest, name=item.nodeid, scope="test")
+
+        item.runtest = run_with_retries
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """
+    Captures the network requests and the page's performance metrics of each browser
+    test and fails the test when one of them exceeds its budget. The page load of a
+    session that was just started or recycled is reported with the test that follows it.
+    Runs the test under the hang watchdog's per-test deadline.
+    """
+    item.perf_metrics = None
+    item.network_summary = None
+    hang_watchdog = item.config.hang_watchdog
+    driver = item.funcargs.get("driver", None)
+    # Started before the first command of the test, so a hang in the commands below is this test's
+    hang_watchdog.start_test(item.nodeid)
+    if driver and hang_watchdog.fired:
+        # The session was killed during setup or between tests: it is replaced after this test
+        hang_watchdog.end_test()
+        raise CommandHangError(f"[FAIL] WebDriver session killed by the hang watchdog before the test: {hang_watchdog.fired}")
+    network_log = driver and item.config.getoption("--network-log")
+    perf_start = None
+    try:
+        if network_log:
+            drain_network_events(driver)  # Drop the requests made before this test
+        if driver and not item.config.getoption("--no-perf-metrics"):
+            try:
+                perf_start = start_measurement(driver)  # Only measure what happens during this test
+            except Exception as e:
+                print(f"[WARN] Could not start the performance measurement: {e}")
+        result = yield
+    except Exception as e:
+        if hang_watchdog.fired:
+            raise CommandHangError(f"[FAIL] WebDriver session killed by the hang watchdog: {hang_watchdog.fired}") from e
+        raise
+    finally:
+        hang_watchdog.end_test()
+        if network_log and not hang_watchdog.fired:
+            _capture_network(item, driver)
+    if hang_watchdog.fired:
+        raise CommandHangError(f"[FAIL] WebDriver session killed by the hang watchdog: {hang_watchdog.fired}")
+
+    violations = []
+    if item.network_summary:
+        violations += check_budgets(item.network_summary, item.config.perf_budgets)
+    page_load = item.config.pending_page_load if driver else None
+    if page_load:
+        item.config.pending_page_load = None
+        violations += check_budgets(page_load, item.config.perf_budgets)
+    if perf_start is not None:
+        try:
+            item.perf_metrics = collect_metrics(driver, start=perf_start)
+        except Exception as e:
+            print(f"[WARN] Could not collect performance metrics: {e}")
+        else:
+            item.user_properties.append(("performance", item.perf_metrics))
+            violations += check_budgets(item.perf_metrics, item.config.perf_budgets)
+            for name, value in (page_load or {}).items():
+                if name != "url":
+                    item.perf_metrics.setdefault(name, value)
+    if violations:
+        raise AssertionError("[FAIL] Performance budget exceeded:\n" + "\n".join(violations))
+    return result
+
+
+def _capture_network(item, driver):
+    """
+    Summarises the requests made during the test and writes them as a compact HAR file.
+    """
+    try:
+        capture = NetworkCapture(drain_network_events(driver), page_url=driver.current_url)
+    except Exception as e:
+        print(f"[WARN] Could not read the network log: {e}")
+        return
+    har_path = os.path.join(item.config.getoption("--har-dir"), f"{item.name}.har")
+    item.network_summary = capture.summary()
+    item.network_summary["har"] = capture.save_har(har_path)
+    item.user_properties.append(("network", item.network_summary))
+    print(f"[INFO] {item.network_summary['network.requests']} requests, {item.network_summary['network.bytes']} bytes "
+          f"({100 * item.network_summary['network.thirdPartyShare']:.1f}% third-party), HAR saved at: {har_path}")
+
+
+def _record_history(item, report):
+    """
+    Stores a test result (and the action timings collected so far) in the run history.
+    """
+    marker = item.get_closest_marker("requirement")
+    docstring = getattr(getattr(item, "function", None), "__doc__", None) or ""
+    description = next((line.strip() for line in docstring.splitlines() if line.strip()), None)
+    action_timings = getattr(item, "action_timings", [])
+    retry_events = item.config.flakiness_stats.events[getattr(item, "retry_events_start", 0):]
+    item.config.run_history.record_result(
+        report.nodeid,
+        report.when,
+        "error" if report.failed and report.when != "call" else report.outcome,
+        report.duration,
+        requirement=marker.args[0] if marker else None,
+        description=description,
+        shard=item.config.stream_report.shard,
+        action_timings=action_timings,
+        retries=retry_events if report.when == "call" else (),
+    )
+    action_timings.clear()
 
 
 @pytest.mark.hookwrapper
 def pytest_runtest_makereport(item, call):
     """
-    Hook to capture screenshots on test failure or specific test parts
-    and embed them into the pytest-html report.
+    Hook to capture screenshots on test failure or specific test parts,
+    stream the result to disk and link the screenshot from the pytest-html report.
     """
     outcome = yield
     report = outcome.get_result()
     extra = getattr(report, 'extra', [])
-    pytest_html = item.config.pluginmanager.getplugin('html')
+    screenshot_path = None
 
     if report.when == 'call':  # For the actual test execution
         driver = item.funcargs.get("driver", None)
-        if driver:
+        if driver and not item.config.hang_watchdog.fired:
             screenshots_dir = os.path.join(os.getcwd(), "screenshots")
             if not os.path.exists(screenshots_dir):
                 os.makedirs(screenshots_dir)
@@ -26,9 +485,29 @@ def pytest_runtest_makereport(item, call):
             test_name = item.name
             timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
             screenshot_path = os.path.join(screenshots_dir, f"{test_name}_{timestamp}.png")
-            driver.save_screenshot(screenshot_path)
-            print(f"[INFO] Screenshot captured for test '{test_name}' at {screenshot_path}")
+            try:
+                driver.save_screenshot(screenshot_path)
+                print(f"[INFO] Screenshot captured for test '{test_name}' at {screenshot_path}")
 
-            # Embed screenshot into the HTML report
-            extra.append(extras.image(screenshot_path))
+                # Link (rather than embed) the screenshot so the HTML report stays small
+                extra.append(extras.url(screenshot_path, name="Screenshot"))
+            except Exception as e:
+                screenshot_path = None
+                hang = item.config.hang_watchdog.fired
+                if hang:
+                    # The screenshot hung and the session was killed: the test that left the browser in that state fails
+                    report.outcome = "failed"
+                    report.longrepr = f"[FAIL] WebDriver session killed by the hang watchdog while taking the screenshot: {hang}"
+                    print(report.longrepr)
+                else:
+                    print(f"[WARN] Could not capture a screenshot for test '{test_name}': {e}")
         report.extra = extra
+
+    # Stream the call result, plus any setup/teardown failure or skip
+    if report.when == 'call' or report.failed or report.skipped:
+        item.config.stream_report.record(report, screenshot=screenshot_path,
+                                         performance=getattr(item, "perf_metrics", None),
+                                         network=getattr(item, "network_summary", None),
+                                         sweep=dict(report.user_properties).get("sweep"))
+        if item.config.run_history:
+            _record_history(item, report)
@@ -0,0 +1,54 @@
+from utilities.history import RunHistory
+
+
+def record_run(db_path, run_id, outcomes, started):
+    """
+    Stores one run with the given {nodeid: call outcome} results.
+    """
+    history = RunHistory(db_path, run_id=run_id)
+    history.start_run()
+    history.connection.execute("UPDATE runs SET started = ? WHERE run_id = ?", (started, run_id))
+    for nodeid, outcome in outcomes.items():
+        history.record_result(nodeid, "call", outcome, 1.0, requirement="TC001" if nodeid.endswith("one") else None,
+                              description="First test", action_timings=[("click", 0.25)])
+    history.finish_run()
+
+
+def test_flakiness_counts_runs_that_both_passed_and_failed(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    record_run(db_path, "run-1", {"t::one": "passed", "t::two": "failed"}, started=1)
+    record_run(db_path, "run-2", {"t::one": "failed", "t::two": "failed"}, started=2)
+    record_run(db_path, "run-3", {"t::one": "passed", "t::two": "failed"}, started=3)
+
+    history = RunHistory(db_path)
+    rows = history.flakiness(last_runs=10)
+    assert len(rows) == 1  # t::two always fails: broken, not flaky
+    nodeid, rate, failed, runs = rows[0]
+    assert (nodeid, failed, runs) == ("t::one", 1, 3)
+    assert round(rate, 3) == 0.333
+
+
+def test_empty_runs_do_not_push_real_runs_out(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    record_run(db_path, "run-1", {"t::one": "passed"}, started=1)
+    record_run(db_path, "run-2", {"t::one": "failed"}, started=2)
+    for index in range(3):
+        record_run(db_path, f"empty-{index}", {}, started=10 + index)
+
+    history = RunHistory(db_path)
+    assert history.slowest_tests(last_runs=2) == [("t::one", 1.0, 1.0, 2)]
+    assert history.flakiness(last_runs=2)[0][2:] == (1, 2)
+
+
+def test_traceability_matrix_keeps_the_latest_result(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    record_run(db_path, "run-1", {"t::one": "failed"}, started=1)
+    record_run(db_path, "run-2", {"t::one": "passed"}, started=2)
+
+    history = RunHistory(db_path)
+    [row] = history.traceability_matrix()
+    requirement, nodeid, description, outcome, _, duration, runs, pass_rate = row
+    assert (requirement, nodeid, description, outcome, runs, pass_rate) == ("TC001", "t::one", "First test", "passed", 2, 50.0)
+    rows = history.export_traceability_matrix(str(tmp_path / "rtm.csv"))
+    assert (tmp_path / "rtm.csv").read_text(encoding="utf-8").splitlines()[0].startswith("Requirement,Test")
+    assert rows == [row]
@@ -0,0 +1,67 @@
+from utilities.network import NetworkCapture
+
+
+def will_be_sent(request_id, url, timestamp, type="Document", redirect_status=None):
+    params = {"requestId": request_id, "request": {"url": url, "method": "GET"}, "type": type,
+              "timestamp": timestamp, "wallTime": 1700000000 + timestamp}
+    if redirect_status:
+        params["redirectResponse"] = {"status": redirect_status}
+    return {"method": "Network.requestWillBeSent", "params": params}
+
+
+def received(request_id, status, mime_type="text/html"):
+    return {"method": "Network.responseReceived",
+            "params": {"requestId": request_id, "response": {"status": status, "mimeType": mime_type}}}
+
+
+def finished(request_id, timestamp, size):
+    return {"method": "Network.loadingFinished",
+            "params": {"requestId": request_id, "timestamp": timestamp, "encodedDataLength": size}}
+
+
+def page_load_events():
+    """
+    A document redirected once, a third-party script and a failed image.
+    """
+    return [
+        will_be_sent("1", "http://example.com/", 10.0),
+        will_be_sent("1", "https://www.example.com/", 10.1, redirect_status=301),
+        received("1", 200),
+        finished("1", 10.4, 3000),
+        will_be_sent("2", "https://cdn.other.net/app.js", 10.5, type="Script"),
+        received("2", 200, "application/javascript"),
+        finished("2", 10.7, 1000),
+        will_be_sent("3", "https://www.example.com/logo.png", 10.6, type="Image"),
+        {"method": "Network.loadingFailed", "params": {"requestId": "3", "timestamp": 10.8}},
+        {"method": "Network.responseReceived", "params": {"requestId": "unknown", "response": {"status": 200}}},
+    ]
+
+
+def test_redirect_hops_are_kept_as_separate_requests():
+    capture = NetworkCapture(page_load_events())
+    hops = sorted((request["start"], request["url"], request["status"]) for request in capture.requests.values()
+                  if request["type"] == "Document")
+    assert hops == [(10.0, "http://example.com/", 301), (10.1, "https://www.example.com/", 200)]
+    assert capture.page_url == "https://www.example.com/"
+
+
+def test_summary_counts_bytes_failures_and_third_parties():
+    summary = NetworkCapture(page_load_events()).summary()
+    assert summary["network.requests"] == 4
+    assert summary["network.bytes"] == 4000
+    assert summary["network.failed"] == 1
+    assert summary["network.thirdPartyRequests"] == 1
+    assert summary["network.thirdPartyShare"] == 0.25
+    assert summary["network.slowest"][0] == (300.0, "https://www.example.com/")
+
+
+def test_har_entries_are_ordered_by_start_time(tmp_path):
+    capture = NetworkCapture(page_load_events())
+    har_path = capture.save_har(str(tmp_path / "har" / "page.har"))
+    entries = capture.to_har()["log"]["entries"]
+    assert [entry["request"]["url"] for entry in entries] == [
+        "http://example.com/", "https://www.example.com/", "https://cdn.other.net/app.js",
+        "https://www.example.com/logo.png"]
+    assert [entry["response"]["status"] for entry in entries] == [301, 200, 200, 0]
+    assert entries[0]["time"] == 100.0
+    assert (tmp_path / "har" / "page.har").exists() and har_path.endswith("page.har")
@@ -0,0 +1,60 @@
+import os
+import shutil
+from types import SimpleNamespace
+from utilities.reporting import StreamingReport, load_results, merge_shards
+
+
+def make_report(nodeid, when="call", outcome="passed", message=""):
+    return SimpleNamespace(nodeid=nodeid, when=when, outcome=outcome, duration=0.5,
+                           failed=outcome == "failed", passed=outcome == "passed", longreprtext=message)
+
+
+def test_worst_outcome_wins_and_messages_are_joined(tmp_path):
+    """
+    A call failure followed by a teardown error is merged into one 'error' row with both messages.
+    """
+    report = StreamingReport(str(tmp_path), shard="gw0")
+    report.record(make_report("tests/a.py::test_one", outcome="failed", message="call failed"))
+    report.record(make_report("tests/a.py::test_one", when="teardown", outcome="failed", message="teardown failed"))
+    report.record(make_report("tests/a.py::test_two"))
+    report.close()
+
+    results = load_results([report.path])
+    assert [record["nodeid"] for record in results] == ["tests/a.py::test_one", "tests/a.py::test_two"]
+    assert results[0]["outcome"] == "error"
+    assert results[0]["message"] == "call failed\n\nteardown failed"
+    assert results[0]["duration"] == 1.0
+    assert results[1]["outcome"] == "passed"
+
+
+def test_shards_merge_into_html_and_junit(tmp_path):
+    shard_dir = tmp_path / "stream"
+    for shard, outcome in (("gw0", "passed"), ("gw1", "failed")):
+        report = StreamingReport(str(shard_dir), shard=shard)
+        report.record(make_report(f"tests/a.py::test_{shard}", outcome=outcome, message="boom"))
+        report.close()
+
+    results = merge_shards(str(shard_dir), html_path=str(tmp_path / "summary.html"), junit_path=str(tmp_path / "junit.xml"))
+    assert len(results) == 2
+    junit = (tmp_path / "junit.xml").read_text(encoding="utf-8")
+    assert 'tests="2" failures="1" errors="0"' in junit
+    assert "2 tests: 1 failed, 1 passed" in (tmp_path / "summary.html").read_text(encoding="utf-8")
+
+
+def test_screenshot_paths_survive_moving_the_reports(tmp_path):
+    """
+    Paths are stored relative to the shard directory, so shards copied from another machine still link.
+    """
+    screenshot = tmp_path / "screenshots" / "test_one.png"
+    screenshot.parent.mkdir()
+    screenshot.write_bytes(b"not an image")
+    report = StreamingReport(str(tmp_path / "reports" / "stream"))
+    record = report.record(make_report("tests/a.py::test_one"), screenshot=str(screenshot))
+    report.close()
+    assert not os.path.isabs(record["screenshot"])
+
+    moved = tmp_path / "elsewhere"
+    shutil.copytree(tmp_path / "reports", moved / "reports")
+    shutil.copytree(tmp_path / "screenshots", moved / "screenshots")
+    result = load_results([str(moved / "reports" / "stream" / "results-main.jsonl")])[0]
+    assert result["screenshot"] == str(moved / "screenshots" / "test_one.png")
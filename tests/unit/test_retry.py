@@ -0,0 +1,110 @@
+import pytest
+from selenium.common.exceptions import NoAlertPresentException, StaleElementReferenceException, TimeoutException
+from utilities.hang import CommandHangError
+from utilities.retry import FlakinessStats, RetryPolicy, is_retryable, reset_page_state, retry_actions
+
+
+def wrapped(error):
+    """
+    Returns the error the way actions raise it: a generic exception raised while handling the original one.
+    """
+    try:
+        try:
+            raise error
+        except Exception as e:
+            raise Exception(f"[FAIL] Could not click the element: {e}")
+    except Exception as e:
+        return e
+
+
+def test_transient_errors_are_found_through_the_context_chain():
+    assert is_retryable(wrapped(TimeoutException("slow")))
+    assert is_retryable(wrapped(StaleElementReferenceException("gone")))
+    assert not is_retryable(wrapped(ValueError("bad data")))
+
+
+def test_assertions_and_hangs_are_never_retried():
+    assert not is_retryable(wrapped(AssertionError("wrong text")))
+    hang = CommandHangError("killed")
+    hang.__cause__ = TimeoutException("slow")
+    assert not is_retryable(hang)
+
+
+def test_policy_retries_transient_errors_then_records_the_recovery():
+    stats = FlakinessStats()
+    resets = []
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise wrapped(TimeoutException("slow"))
+        return "done"
+
+    policy = RetryPolicy(retries=2, backoff=0, reset=lambda: resets.append(1), stats=stats)
+    assert policy.run(flaky, name="click_element") == "done"
+    assert (len(attempts), len(resets)) == (3, 2)
+    assert stats.summary() == [("action", "click_element", 1, 1, 2)]
+
+
+def test_policy_raises_real_failures_immediately():
+    stats = FlakinessStats()
+    attempts = []
+
+    def failing():
+        attempts.append(1)
+        raise AssertionError("wrong text")
+
+    with pytest.raises(AssertionError):
+        RetryPolicy(retries=3, backoff=0, stats=stats).run(failing)
+    assert len(attempts) == 1
+    assert stats.events == []
+
+
+def test_only_the_outermost_action_is_retried():
+    calls = []
+
+    class Actions:
+        def inner(self):
+            calls.append("inner")
+            raise TimeoutException("slow")
+
+        def outer(self):
+            calls.append("outer")
+            self.inner()
+
+    actions = retry_actions(Actions(), RetryPolicy(retries=1, backoff=0))
+    with pytest.raises(TimeoutException):
+        actions.outer()
+    assert calls == ["outer", "inner", "outer", "inner"]
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    @property
+    def alert(self):
+        raise NoAlertPresentException()
+
+    def window(self, handle):
+        self.driver.current = handle
+
+    def default_content(self):
+        pass
+
+
+class FakeDriver:
+    def __init__(self, handles):
+        self.window_handles = list(handles)
+        self.current = handles[0]
+        self.switch_to = FakeSwitchTo(self)
+
+    def close(self):
+        self.window_handles.remove(self.current)
+
+
+def test_reset_keeps_the_main_window_whatever_the_handle_order():
+    driver = FakeDriver(["popup", "main", "other"])
+    reset_page_state(driver, main_handle="main")
+    assert (driver.window_handles, driver.current) == (["main"], "main")
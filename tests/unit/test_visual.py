@@ -0,0 +1,51 @@
+import os
+import numpy as np
+from PIL import Image
+from utilities.visual import VisualBaselines, pixel_diff, read_masks
+
+
+def gradient(width=400, height=200):
+    pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    pixels[:, :, 0] = np.linspace(0, 255, width, dtype=np.uint8)[None, :]
+    return pixels
+
+
+def save(pixels, path):
+    Image.fromarray(pixels).save(path)
+    return str(path)
+
+
+def test_first_screenshot_becomes_the_baseline_and_identical_files_pass(tmp_path):
+    baselines = VisualBaselines(str(tmp_path / "baselines"))
+    screenshot = save(gradient(), tmp_path / "page.png")
+    assert baselines.compare("page", screenshot)["status"] == "new"
+    result = baselines.compare("page", screenshot)
+    assert (result["status"], result["reason"]) == ("passed", "identical file")
+
+
+def test_pixel_diff_ignores_masked_regions():
+    baseline = gradient()
+    actual = baseline.copy()
+    actual[10:20, 10:20] = 255
+    _, ratio = pixel_diff(actual, baseline)
+    assert ratio == 100 / (400 * 200)
+    _, ratio = pixel_diff(actual, baseline, ignore_regions=[(0, 0, 50, 50)])
+    assert ratio == 0.0
+
+
+def test_change_inside_a_mask_does_not_trip_the_hash_prefilter(tmp_path):
+    baselines = VisualBaselines(str(tmp_path / "baselines"))
+    baselines.compare("page", save(gradient(800, 400), tmp_path / "baseline.png"))
+    actual = gradient(800, 400)
+    actual[:400, :400, 0] = np.linspace(255, 0, 400, dtype=np.uint8)[None, :]  # e.g. a rotating banner
+    screenshot = save(actual, tmp_path / "actual.png")
+
+    result = baselines.compare("page", screenshot, ignore_regions=[(0, 0, 400, 400)])
+    assert (result["status"], result["reason"]) == ("passed", "within tolerance")
+    result = baselines.compare("page", screenshot)
+    assert (result["status"], result["reason"]) == ("failed", "perceptual hash mismatch")
+
+
+def test_sample_masks_file_is_readable():
+    masks = read_masks(os.path.join(os.path.dirname(__file__), "..", "..", "data", "visual_masks.csv"))
+    assert masks["test_case_iframe_highlighted_text"] == [(40, 0, 1800, 1217)]
@@ -1,12 +1,16 @@
 import csv
 from datetime import datetime  
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import os
 from locators.locators import Locators
+from utilities.lazy import LazyImport
+from utilities.visual import VisualBaselines
 from selenium.common.exceptions import TimeoutException  # Import this for handling timeouts
 
+# Selenium's webdriver package is only imported when the first action runs
+By = LazyImport("selenium.webdriver.common.by", "By")
+WebDriverWait = LazyImport("selenium.webdriver.support.ui", "WebDriverWait")
+EC = LazyImport("selenium.webdriver.support.expected_conditions")
+
 
 class Actions:
     def __init__(self, driver):
@@ -502,6 +506,33 @@ class Actions:
         print(f"[INFO] Screenshot saved at: {screenshot_path}")
         return screenshot_path
 
+    def check_visual(self, name, element_locator=None, ignore_regions=None, update=False):
+        """
+        Takes a screenshot of the page (or of one element) and compares it with the stored baseline.
+        The first screenshot taken for a name becomes its baseline.
+
+        Args:
+            name (str): Baseline name (e.g. the test or element name).
+            element_locator (str, optional): XPath of the element to capture instead of the whole page.
+            ignore_regions (list, optional): (x, y, width, height) rectangles to leave out of the comparison.
+            update (bool): Accept the new screenshot as the baseline when it differs.
+
+        Raises:
+            AssertionError: If the screenshot differs from the baseline.
+        """
+        if element_locator:
+            screenshots_dir = os.path.join(os.getcwd(), "screenshots")
+            os.makedirs(screenshots_dir, exist_ok=True)
+            timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+            screenshot_path = os.path.join(screenshots_dir, f"{name}_{timestamp}.png")
+            self.driver.find_element(By.XPATH, element_locator).screenshot(screenshot_path)
+        else:
+            screenshot_path = self.take_screenshot(name)
+
+        result = VisualBaselines().compare(name, screenshot_path, ignore_regions=ignore_regions, update=update)
+        assert result["status"] != "failed", f"[FAIL] Visual change in '{name}': {result['reason']} (diff: {result['diff']})"
+        print(f"[PASS] Visual check '{name}': {result['reason']}")
+
     def scroll_and_screenshot(self, element_locator, screenshot_name):
         """
         Scrolls to the specified element and takes a screenshot.
@@ -1,23 +1,60 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+import os
+from utilities.lazy import LazyImport
 
-def setup_browser():
+# The browser backends are only imported when the first session is started
+webdriver = LazyImport("selenium.webdriver")
+ChromeService = LazyImport("selenium.webdriver.chrome.service", "Service")
+Options = LazyImport("selenium.webdriver.chrome.options", "Options")
+ChromeDriverManager = LazyImport("webdriver_manager.chrome", "ChromeDriverManager")
+PooledRemoteConnection = LazyImport("utilities.remote", "PooledRemoteConnection")
+
+def build_chrome_options(profile_dir=None, network_logging=False):
     """
-    Sets up the Selenium WebDriver with Chrome.
-    Returns the WebDriver instance.
+    Builds the Chrome options shared by local and remote sessions.
+    With a profile_dir the browser starts from that (warm) user-data-dir instead of incognito.
+    With network_logging the CDP Network events are recorded in the 'performance' log.
     """
     chrome_options = Options()
     chrome_options.add_argument("--start-maximized")  # Open browser in full screen
     chrome_options.add_argument("--disable-notifications")  # Disable browser notifications
-    chrome_options.add_argument("--incognito")  # Open browser in incognito mode
+    if profile_dir:
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")  # Reuse the cached profile
+        chrome_options.add_argument("--no-first-run")  # Skip the first-run dialogs of a new profile
+    else:
+        chrome_options.add_argument("--incognito")  # Open browser in incognito mode
     chrome_options.add_argument("--disable-infobars")  # Disable 'Chrome is being controlled by automated test software'
+    if network_logging:
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})  # Record Network events
+    return chrome_options
+
+def setup_browser(remote_url=None, profile_dir=None, network_logging=False):
+    """
+    Sets up the Selenium WebDriver with Chrome.
+    When remote_url is given, the session is created on that W3C endpoint (grid node or
+    standalone chromedriver) through the shared keep-alive connection pool.
+    When profile_dir is given, Chrome starts from that user-data-dir (see utilities/profiles.py).
+    When network_logging is True, network events can be read with utilities/network.py.
+    Returns the WebDriver instance.
+    """
+    if remote_url:
+        driver = webdriver.Remote(command_executor=PooledRemoteConnection(remote_url), options=build_chrome_options(profile_dir, network_logging))
+        print(f"[INFO] Started remote session {driver.session_id} on {remote_url}")
+        return driver
 
     # Initialize WebDriver with WebDriver Manager
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
+    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=build_chrome_options(profile_dir, network_logging))
     return driver
 
+def start_local_endpoint(port=0):
+    """
+    Starts a standalone chromedriver that any number of remote sessions can share.
+    Returns the running service; its URL is available as service.service_url.
+    """
+    service = ChromeService(ChromeDriverManager().install(), port=port)
+    service.start()
+    print(f"[INFO] Local chromedriver endpoint listening on {service.service_url}")
+    return service
+
 def teardown_browser(driver):
     """
     Tears down the WebDriver instance.
@@ -0,0 +1,219 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from utilities.lazy import LazyImport
+from utilities.watchdog import driver_processes, service_processes
+
+psutil = LazyImport("psutil")
+urllib3 = LazyImport("urllib3")
+
+
+class CommandHangError(Exception):
+    """
+    Raised in place of the error of a test whose WebDriver session was killed by the hang watchdog.
+    """
+
+
+class HangWatchdog:
+    """
+    Enforces per-command and per-test deadlines on the WebDriver channel from a background thread.
+
+    Every command sent through an instrumented driver registers a deadline. When a
+    command (or the whole test) overruns, the watchdog writes diagnostics and kills
+    the session: the blocked command then fails, which fails only the running test,
+    and the session is replaced before the next test.
+    """
+
+    def __init__(self, command_timeout=60, test_timeout=0, command_timeouts=None,
+                 diagnostics_dir=os.path.join("reports", "hangs"), poll_interval=0.25, request_grace=5):
+        """
+        Args:
+            command_timeout (float): Default deadline of a single command in seconds (0 disables it).
+            test_timeout (float): Deadline of a whole test in seconds (0 disables it).
+            command_timeouts (dict, optional): Deadlines for specific commands (e.g. {'screenshot': 20}).
+            diagnostics_dir (str): Where the diagnostics of a hang are written.
+            poll_interval (float): How often the watchdog thread checks the deadlines.
+            request_grace (float): How long after its deadline the HTTP request of a command gives up
+                by itself, in case killing the session does not unblock it.
+        """
+        self.command_timeout = command_timeout
+        self.test_timeout = test_timeout
+        self.command_timeouts = command_timeouts or {}
+        self.diagnostics_dir = diagnostics_dir
+        self.poll_interval = poll_interval
+        self.request_grace = request_grace
+        self.driver = None
+        self.endpoint = None  # local chromedriver service shared by the remote sessions of this process
+        self.fired = None
+        self.hangs = []
+        self._lock = threading.Lock()
+        self._command = None
+        self._test = None
+        self._main_thread_id = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread = None
+
+    def instrument(self, driver):
+        """
+        Routes every command of the driver through the watchdog. Call it for each new session.
+        The watchdog thread is started with the first session.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="webdriver-hang-watchdog", daemon=True)
+            self._thread.start()
+        executor = driver.command_executor
+        original_execute = executor.execute
+        client_config = getattr(executor, "_client_config", None)
+
+        def execute(command, params):
+            timeout = self._begin_command(command, params)
+            default_timeout = client_config.timeout if client_config else None
+            if timeout and client_config:
+                # Selenium sends this timeout with the request: a blocked read now ends shortly after the deadline
+                client_config.timeout = request_timeout(default_timeout, timeout + self.request_grace)
+            try:
+                return original_execute(command, params)
+            finally:
+                if timeout and client_config:
+                    client_config.timeout = default_timeout
+                self._end_command()
+
+        executor.execute = execute
+        self.driver = driver
+        return driver
+
+    def start_test(self, nodeid):
+        """
+        Starts the per-test deadline. A hang that fired earlier stays set until its session is replaced.
+        """
+        with self._lock:
+            deadline = time.monotonic() + self.test_timeout if self.test_timeout else None
+            self._test = (nodeid, time.monotonic(), deadline)
+
+    def end_test(self):
+        with self._lock:
+            self._test = None
+
+    def _begin_command(self, command, params):
+        """
+        Registers the command's deadline and returns the seconds left until it (or the test's deadline) passes.
+        """
+        timeout = self.command_timeouts.get(command, self.command_timeout)
+        with self._lock:
+            now = time.monotonic()
+            deadline = now + timeout if timeout else None
+            self._command = (command, params, now, deadline)
+            deadlines = [end for end in (deadline, self._test[2] if self._test else None) if end]
+        return max(min(deadlines) - now, 0) if deadlines else None
+
+    def _end_command(self):
+        with self._lock:
+            self._command = None
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            now = time.monotonic()
+            with self._lock:
+                command, test = self._command, self._test
+                if self.fired:
+                    continue
+                if command and command[3] and now > command[3]:
+                    reason = f"command '{command[0]}' exceeded its {command[3] - command[2]:.1f}s deadline"
+                elif test and test[2] and now > test[2]:
+                    reason = f"test exceeded its {test[2] - test[1]:.1f}s deadline"
+                else:
+                    continue
+                self.fired = reason
+            self._handle_hang(reason, command, test)
+
+    def _handle_hang(self, reason, command, test):
+        nodeid = test[0] if test else "(between tests)"
+        print(f"[FAIL] WebDriver hang in {nodeid}: {reason}. Killing the session.")
+        diagnostics = self._write_diagnostics(reason, command, test)
+        self.hangs.append({"nodeid": nodeid, "reason": reason, "diagnostics": diagnostics})
+        self._kill_session()
+
+    def _write_diagnostics(self, reason, command, test):
+        """
+        Writes the blocked command, the main thread's stack and the browser processes to a text file.
+        """
+        os.makedirs(self.diagnostics_dir, exist_ok=True)
+        name = (test[0].split("::")[-1] if test else "session").replace("/", "_")
+        path = os.path.join(self.diagnostics_dir, f"{name}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.txt")
+        lines = [f"Reason: {reason}", f"Test: {test[0] if test else '-'}"]
+        if command:
+            lines.append(f"Command: {command[0]} {str(command[1])[:500]}")
+            lines.append(f"Command running for: {time.monotonic() - command[2]:.1f}s")
+        frame = sys._current_frames().get(self._main_thread_id)
+        if frame is not None:
+            lines.append("\nMain thread stack:")
+            lines.extend(line.rstrip() for line in traceback.format_stack(frame))
+        lines.append("\nBrowser processes:")
+        for process in self._processes():
+            try:
+                lines.append(f"  {process.pid} {process.name()} {process.status()} "
+                             f"rss={process.memory_info().rss // 1024 // 1024} MB")
+            except psutil.Error:
+                continue
+        with open(path, mode="w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        print(f"[INFO] Hang diagnostics saved at: {path}")
+        return path
+
+    def _processes(self):
+        """
+        Returns the processes of the current session: its own chromedriver and browsers, or the
+        browsers started by the local endpoint of this process (not the endpoint itself, which keeps serving).
+        """
+        processes = driver_processes(self.driver)
+        if not processes and self.endpoint is not None:
+            processes = service_processes(self.endpoint)[1:]
+        return processes
+
+    def _kill_session(self):
+        """
+        Kills the local driver and browser processes, or deletes the remote session,
+        so the blocked command returns with an error. On a remote endpoint the command's
+        request also gives up by itself shortly after the deadline (see instrument).
+        """
+        processes = self._processes()
+        if processes:
+            for process in reversed(processes):
+                try:
+                    process.kill()
+                except psutil.Error:
+                    continue
+            return
+        executor = getattr(self.driver, "command_executor", None)
+        server = getattr(getattr(executor, "_client_config", None), "remote_server_addr", None)
+        if server and self.driver.session_id:
+            try:
+                urllib3.request("DELETE", f"{server.rstrip('/')}/session/{self.driver.session_id}",
+                                timeout=urllib3.Timeout(total=10), retries=False)
+            except Exception as e:
+                print(f"[WARN] Could not delete the hung remote session: {e}")
+
+    def stop(self):
+        self._stop.set()
+
+
+def request_timeout(default, read):
+    """
+    Returns the urllib3 timeout of one request: the connect timeout of the default, the given read timeout.
+    """
+    connect = default.connect_timeout if isinstance(default, urllib3.Timeout) else default
+    return urllib3.Timeout(connect=connect, read=read)
+
+
+def parse_command_timeouts(value):
+    """
+    Parses 'screenshot=20,getAlertText=10' into {'screenshot': 20.0, 'getAlertText': 10.0}.
+    """
+    timeouts = {}
+    for pair in filter(None, (part.strip() for part in (value or "").split(","))):
+        command, _, seconds = pair.partition("=")
+        timeouts[command.strip()] = float(seconds)
+    return timeouts
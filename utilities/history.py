@@ -0,0 +1,314 @@
+import argparse
+import csv
+import functools
+import os
+import sqlite3
+import time
+import uuid
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started REAL NOT NULL,
+    finished REAL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    nodeid TEXT NOT NULL,
+    requirement TEXT,
+    description TEXT,
+    shard TEXT,
+    phase TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS action_timings (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    nodeid TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS retries (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    nodeid TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    name TEXT NOT NULL,
+    retries INTEGER NOT NULL,
+    recovered INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_nodeid ON results(nodeid, timestamp);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id);
+CREATE INDEX IF NOT EXISTS idx_action_timings_run ON action_timings(run_id, nodeid);
+"""
+
+RTM_COLUMNS = ["Requirement", "Test", "Description", "Latest Result", "Last Run", "Duration (s)", "Runs", "Pass Rate (%)"]
+
+
+class RunHistory:
+    """
+    Local SQLite store of test outcomes, durations and per-action timings.
+
+    Several shards of the same run can write to one database concurrently: they
+    share a ``run_id`` and SQLite's WAL mode serialises the short write transactions.
+    """
+
+    def __init__(self, db_path, run_id=None):
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.run_id = run_id or datetime_run_id()
+        self.connection = sqlite3.connect(db_path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def start_run(self):
+        """
+        Registers the current run (a no-op if another shard already did).
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO runs (run_id, started) VALUES (?, ?)", (self.run_id, time.time())
+            )
+
+    def finish_run(self):
+        """
+        Stamps the run's finish time and closes the connection.
+        """
+        with self.connection:
+            self.connection.execute("UPDATE runs SET finished = ? WHERE run_id = ?", (time.time(), self.run_id))
+        self.connection.close()
+
+    def record_result(self, nodeid, phase, outcome, duration, requirement=None, description=None,
+                      shard=None, action_timings=(), retries=()):
+        """
+        Stores the outcome of one test phase together with the timings of the actions it ran.
+
+        Args:
+            nodeid (str): The pytest node id of the test.
+            phase (str): 'setup', 'call' or 'teardown'.
+            outcome (str): 'passed', 'failed', 'error', 'skipped'...
+            duration (float): Duration of the phase in seconds.
+            requirement (str, optional): Requirement / test case id covered by the test (e.g. 'TC001').
+            description (str, optional): Short description of the test.
+            shard (str, optional): Name of the shard that ran the test.
+            action_timings (list, optional): (action name, duration) pairs in execution order.
+            retries (list, optional): Retry events of the test and its actions (see utilities/retry.py).
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO results (run_id, nodeid, requirement, description, shard, phase, outcome, duration, timestamp) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, nodeid, requirement, description, shard, phase, outcome, duration, time.time()),
+            )
+            self.connection.executemany(
+                "INSERT INTO action_timings (run_id, nodeid, seq, action, duration) VALUES (?, ?, ?, ?, ?)",
+                [(self.run_id, nodeid, seq, action, action_duration)
+                 for seq, (action, action_duration) in enumerate(action_timings)],
+            )
+            self.connection.executemany(
+                "INSERT INTO retries (run_id, nodeid, scope, name, retries, recovered) VALUES (?, ?, ?, ?, ?, ?)",
+                [(self.run_id, nodeid, event["scope"], event["name"], event["retries"], int(event["recovered"]))
+                 for event in retries],
+            )
+
+    def _recent_runs_clause(self, last_runs):
+        # Only runs that stored results count, so aborted or empty runs don't push real ones out
+        return (
+            "run_id IN (SELECT run_id FROM runs WHERE EXISTS "
+            "(SELECT 1 FROM results WHERE results.run_id = runs.run_id) ORDER BY started DESC LIMIT ?)",
+            (last_runs,),
+        )
+
+    def slowest_tests(self, last_runs=10, limit=10):
+        """
+        Returns the tests with the highest average call duration over the last N runs.
+
+        Returns:
+            list: (nodeid, average duration, max duration, number of runs) tuples.
+        """
+        clause, params = self._recent_runs_clause(last_runs)
+        return self.connection.execute(
+            f"SELECT nodeid, AVG(duration), MAX(duration), COUNT(DISTINCT run_id) FROM results "
+            f"WHERE phase = 'call' AND {clause} GROUP BY nodeid ORDER BY AVG(duration) DESC LIMIT ?",
+            params + (limit,),
+        ).fetchall()
+
+    def slowest_actions(self, last_runs=10, limit=10):
+        """
+        Returns the actions with the highest average duration over the last N runs.
+
+        Returns:
+            list: (action, average duration, max duration, number of calls) tuples.
+        """
+        clause, params = self._recent_runs_clause(last_runs)
+        return self.connection.execute(
+            f"SELECT action, AVG(duration), MAX(duration), COUNT(*) FROM action_timings "
+            f"WHERE {clause} GROUP BY action ORDER BY AVG(duration) DESC LIMIT ?",
+            params + (limit,),
+        ).fetchall()
+
+    def flakiness(self, last_runs=20, limit=10):
+        """
+        Returns the tests that both passed and failed over the last N runs.
+
+        The flakiness rate is the share of runs in which the test failed.
+
+        Returns:
+            list: (nodeid, flakiness rate, failed runs, total runs) tuples.
+        """
+        clause, params = self._recent_runs_clause(last_runs)
+        return self.connection.execute(
+            f"SELECT nodeid, 1.0 * SUM(failed) / COUNT(*), SUM(failed), COUNT(*) FROM ("
+            f"  SELECT run_id, nodeid, MAX(outcome IN ('failed', 'error')) AS failed FROM results "
+            f"  WHERE {clause} AND outcome != 'skipped' GROUP BY run_id, nodeid"
+            f") GROUP BY nodeid HAVING SUM(failed) > 0 AND SUM(failed) < COUNT(*) "
+            f"ORDER BY 2 DESC LIMIT ?",
+            params + (limit,),
+        ).fetchall()
+
+    def retry_stats(self, last_runs=20, limit=10):
+        """
+        Returns the tests and actions that needed retries over the last N runs.
+
+        Returns:
+            list: (nodeid, scope, name, retried calls, recovered calls, total retries) tuples, most retried first.
+        """
+        clause, params = self._recent_runs_clause(last_runs)
+        return self.connection.execute(
+            f"SELECT nodeid, scope, name, COUNT(*), SUM(recovered), SUM(retries) FROM retries "
+            f"WHERE {clause} GROUP BY nodeid, scope, name ORDER BY COUNT(*) DESC LIMIT ?",
+            params + (limit,),
+        ).fetchall()
+
+    def traceability_matrix(self):
+        """
+        Builds the requirements traceability matrix from the stored history.
+
+        Returns:
+            list: One row per (requirement, test) with the latest result, ordered by requirement.
+        """
+        rows = self.connection.execute(
+            """
+            WITH per_run AS (
+                SELECT run_id, nodeid, MAX(requirement) AS requirement, MAX(description) AS description,
+                       MAX(timestamp) AS timestamp, SUM(duration) AS duration,
+                       CASE WHEN SUM(outcome = 'error') > 0 THEN 'error'
+                            WHEN SUM(outcome = 'failed') > 0 THEN 'failed'
+                            WHEN SUM(outcome = 'skipped') > 0 THEN 'skipped'
+                            ELSE 'passed' END AS outcome
+                FROM results GROUP BY run_id, nodeid
+            ),
+            ranked AS (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY timestamp DESC) AS position,
+                       COUNT(*) OVER (PARTITION BY nodeid) AS runs,
+                       AVG(outcome = 'passed') OVER (PARTITION BY nodeid) AS pass_rate
+                FROM per_run
+            )
+            SELECT COALESCE(requirement, ''), nodeid, COALESCE(description, ''), outcome, timestamp,
+                   duration, runs, pass_rate
+            FROM ranked WHERE position = 1 ORDER BY requirement IS NULL, requirement, nodeid
+            """
+        ).fetchall()
+        return [
+            [requirement, nodeid, description, outcome,
+             time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+             round(duration, 3), runs, round(100 * pass_rate, 1)]
+            for requirement, nodeid, description, outcome, timestamp, duration, runs, pass_rate in rows
+        ]
+
+    def export_traceability_matrix(self, output_path):
+        """
+        Writes the traceability matrix as XLSX or CSV, depending on the file extension.
+        """
+        rows = self.traceability_matrix()
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        if output_path.lower().endswith(".xlsx"):
+            from openpyxl import Workbook
+
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet("RTM")
+            sheet.append(RTM_COLUMNS)
+            for row in rows:
+                sheet.append(row)
+            workbook.save(output_path)
+        else:
+            with open(output_path, mode="w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(RTM_COLUMNS)
+                writer.writerows(rows)
+        print(f"[INFO] Traceability matrix with {len(rows)} rows saved at: {output_path}")
+        return rows
+
+
+def datetime_run_id():
+    """
+    Returns a sortable, unique run id (e.g. '2024-12-03_09-56-33_1a2b3c').
+    """
+    return f"{time.strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def record_action_timings(actions, timings):
+    """
+    Times every public method call made on an Actions instance.
+
+    The wrappers are installed on the instance, so calls an action makes to other
+    actions (e.g. handle_suggestion_class -> enter_text_for_suggestions) are timed too.
+
+    Args:
+        actions (Actions): The instance to instrument.
+        timings (list): List that receives (action name, duration) pairs.
+
+    Returns:
+        Actions: The same instance.
+    """
+    def timed(name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timings.append((name, round(time.perf_counter() - start, 4)))
+        return wrapper
+
+    for name in dir(type(actions)):
+        if not name.startswith("_") and callable(getattr(type(actions), name)):
+            setattr(actions, name, timed(name, getattr(actions, name)))
+    return actions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the local test run history.")
+    parser.add_argument("--db", default="reports/history.db", help="Path of the history database")
+    commands = parser.add_subparsers(dest="command", required=True)
+    rtm = commands.add_parser("rtm", help="Export the requirements traceability matrix")
+    rtm.add_argument("--output", default="reports/RTM_Report.xlsx", help="Output path (.xlsx or .csv)")
+    for name in ("slowest", "actions", "flaky", "retries"):
+        command = commands.add_parser(name)
+        command.add_argument("--runs", type=int, default=10, help="Number of most recent runs to consider")
+        command.add_argument("--limit", type=int, default=10, help="Number of rows to print")
+    args = parser.parse_args(argv)
+
+    history = RunHistory(args.db)
+    if args.command == "rtm":
+        history.export_traceability_matrix(args.output)
+    elif args.command == "slowest":
+        for nodeid, average, maximum, runs in history.slowest_tests(args.runs, args.limit):
+            print(f"{average:8.3f}s avg {maximum:8.3f}s max {runs:4d} runs  {nodeid}")
+    elif args.command == "actions":
+        for action, average, maximum, calls in history.slowest_actions(args.runs, args.limit):
+            print(f"{average:8.3f}s avg {maximum:8.3f}s max {calls:6d} calls  {action}")
+    elif args.command == "flaky":
+        for nodeid, rate, failed, runs in history.flakiness(args.runs, args.limit):
+            print(f"{100 * rate:6.1f}% flaky ({failed}/{runs} runs failed)  {nodeid}")
+    else:
+        for nodeid, scope, name, calls, recovered, retries in history.retry_stats(args.runs, args.limit):
+            print(f"{calls:5d} retried {recovered:5d} recovered {retries:5d} retries  {scope:<6} {name}  ({nodeid})")
+
+
+if __name__ == "__main__":
+    main()
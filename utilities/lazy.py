@@ -0,0 +1,45 @@
+import importlib
+import time
+
+
+# Module name -> seconds it took to import on first use
+IMPORT_TIMINGS = {}
+
+
+class LazyImport:
+    """
+    Stands in for a module (or an attribute of a module) and imports it on first use.
+
+    Selenium's webdriver package, webdriver_manager, NumPy and Pillow take a noticeable
+    part of interpreter start-up; deferring them keeps collection, dry runs and workers
+    that never start a browser fast.
+
+    Example:
+        By = LazyImport("selenium.webdriver.common.by", "By")
+        np = LazyImport("numpy")
+    """
+
+    def __init__(self, module, attribute=None):
+        self._module = module
+        self._attribute = attribute
+        self._target = None
+
+    def _load(self):
+        if self._target is None:
+            start = time.perf_counter()
+            target = importlib.import_module(self._module)
+            IMPORT_TIMINGS.setdefault(self._module, time.perf_counter() - start)
+            self._target = getattr(target, self._attribute) if self._attribute else target
+        return self._target
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+    def __repr__(self):
+        name = f"{self._module}.{self._attribute}" if self._attribute else self._module
+        return f"<lazy {name} ({'loaded' if self._target is not None else 'not loaded'})>"
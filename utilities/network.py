@@ -0,0 +1,130 @@
+import json
+import os
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+
+SLOWEST_COUNT = 5
+
+
+def drain_network_events(driver):
+    """
+    Reads (and thereby empties) Chrome's performance log and returns the CDP Network events in it.
+    The driver must be started with network logging enabled (see build_chrome_options).
+    """
+    events = []
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message["method"].startswith("Network."):
+            events.append(message)
+    return events
+
+
+def site_of(url):
+    """
+    Returns the site (last two labels of the host) used to tell first- from third-party requests.
+    """
+    host = urlparse(url).hostname or ""
+    return ".".join(host.split(".")[-2:])
+
+
+class NetworkCapture:
+    """
+    Requests reconstructed from the CDP Network events of one test.
+    """
+
+    def __init__(self, events, page_url=None):
+        self.requests = {}
+        for event in events:
+            params = event["params"]
+            request = self.requests.get(params.get("requestId"))
+            method = event["method"]
+            if method == "Network.requestWillBeSent":
+                if request and params.get("redirectResponse"):
+                    # A redirect reuses the request id; keep the finished hop as its own entry
+                    request.update(status=params["redirectResponse"]["status"], end=params["timestamp"])
+                    self.requests[f"{params['requestId']}:{len(self.requests)}"] = request
+                self.requests[params["requestId"]] = {
+                    "url": params["request"]["url"],
+                    "method": params["request"]["method"],
+                    "type": params.get("type", "Other"),
+                    "start": params["timestamp"],
+                    "wall_time": params.get("wallTime"),
+                    "end": None,
+                    "status": 0,
+                    "mime_type": "",
+                    "bytes": 0,
+                    "failed": False,
+                }
+            elif request is None:
+                continue
+            elif method == "Network.responseReceived":
+                response = params["response"]
+                request.update(status=response["status"], mime_type=response.get("mimeType", ""))
+            elif method == "Network.loadingFinished":
+                request.update(end=params["timestamp"], bytes=int(params.get("encodedDataLength", 0)))
+            elif method == "Network.loadingFailed":
+                request.update(end=params["timestamp"], failed=True)
+
+        documents = [request["url"] for request in self.requests.values() if request["type"] == "Document"]
+        self.page_url = documents[0] if documents else page_url or ""
+
+    @staticmethod
+    def duration_ms(request):
+        if request["end"] is None:
+            return None
+        return round(1000 * (request["end"] - request["start"]), 1)
+
+    def summary(self):
+        """
+        Summarises the capture as flat 'network.*' metrics (usable with the performance budgets).
+
+        Returns:
+            dict: Request count, bytes transferred, failures, third-party share and the slowest resources.
+        """
+        requests = list(self.requests.values())
+        page_site = site_of(self.page_url)
+        third_party = [request for request in requests if site_of(request["url"]) != page_site]
+        total_bytes = sum(request["bytes"] for request in requests)
+        timed = [(self.duration_ms(request), request["url"]) for request in requests if request["end"] is not None]
+        return {
+            "url": self.page_url,
+            "network.requests": len(requests),
+            "network.bytes": total_bytes,
+            "network.failed": sum(request["failed"] for request in requests),
+            "network.thirdPartyRequests": len(third_party),
+            "network.thirdPartyShare": round(sum(request["bytes"] for request in third_party) / total_bytes, 4) if total_bytes else 0.0,
+            "network.slowest": sorted(timed, reverse=True)[:SLOWEST_COUNT],
+        }
+
+    def to_har(self):
+        """
+        Returns the capture as a compact HAR 1.2 document (no headers, cookies or bodies).
+        """
+        entries = []
+        for request in sorted(self.requests.values(), key=lambda request: request["start"]):
+            started = datetime.fromtimestamp(request["wall_time"] or 0, tz=timezone.utc)
+            duration = self.duration_ms(request) or 0
+            entries.append({
+                "startedDateTime": started.isoformat(),
+                "time": duration,
+                "request": {"method": request["method"], "url": request["url"], "httpVersion": "", "headers": [],
+                            "queryString": [], "cookies": [], "headersSize": -1, "bodySize": -1},
+                "response": {"status": request["status"], "statusText": "", "httpVersion": "", "headers": [],
+                             "cookies": [], "content": {"size": request["bytes"], "mimeType": request["mime_type"]},
+                             "redirectURL": "", "headersSize": -1, "bodySize": request["bytes"],
+                             "_transferSize": request["bytes"]},
+                "cache": {},
+                "timings": {"send": 0, "wait": duration, "receive": 0},
+                "_resourceType": request["type"],
+            })
+        return {"log": {"version": "1.2", "creator": {"name": "utilities.network", "version": "1.0"}, "entries": entries}}
+
+    def save_har(self, har_path):
+        """
+        Writes the compact HAR file and returns its path.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(har_path)), exist_ok=True)
+        with open(har_path, mode="w", encoding="utf-8") as file:
+            json.dump(self.to_har(), file, separators=(",", ":"))
+        return har_path
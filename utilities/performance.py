@@ -0,0 +1,161 @@
+import csv
+import os
+
+
+# Records long tasks from the very start of every document; must be installed before navigation
+LONG_TASK_OBSERVER_SCRIPT = """
+window.__longTasks = [];
+try {
+    new PerformanceObserver(function (list) {
+        list.getEntries().forEach(function (entry) {
+            window.__longTasks.push({start: entry.startTime, duration: entry.duration});
+        });
+    }).observe({type: 'longtask', buffered: true});
+} catch (e) {}
+"""
+
+# Starts a new measurement on the current document: drops the long tasks seen so far
+START_MEASUREMENT_SCRIPT = """
+if (window.__longTasks) { window.__longTasks.length = 0; }
+return performance.timeOrigin;
+"""
+
+# Reads Navigation Timing, Paint Timing and the long tasks of the current document in one round trip
+READ_TIMINGS_SCRIPT = """
+var navigation = performance.getEntriesByType('navigation')[0];
+return {
+    url: window.location.href,
+    timeOrigin: performance.timeOrigin,
+    navigation: navigation ? navigation.toJSON() : null,
+    paint: performance.getEntriesByType('paint').map(function (entry) { return [entry.name, entry.startTime]; }),
+    longTasks: window.__longTasks || []
+};
+"""
+
+CDP_METRICS = ("JSHeapUsedSize", "JSHeapTotalSize", "LayoutCount", "RecalcStyleCount", "LayoutDuration",
+               "RecalcStyleDuration", "ScriptDuration", "TaskDuration", "Nodes", "Documents")
+# CDP metrics that count up for the life of the renderer; reported as the increase during the test
+CUMULATIVE_CDP_METRICS = ("LayoutCount", "RecalcStyleCount", "LayoutDuration", "RecalcStyleDuration",
+                          "ScriptDuration", "TaskDuration")
+
+
+def install_performance_observers(driver):
+    """
+    Starts the long task observer on every new document and enables CDP performance metrics.
+    Call it before the first navigation. Returns False when the driver has no CDP access (e.g. remote).
+    """
+    if not hasattr(driver, "execute_cdp_cmd"):
+        print("[WARN] Driver has no CDP access; only Navigation and Paint Timing will be collected.")
+        return False
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": LONG_TASK_OBSERVER_SCRIPT})
+    driver.execute_cdp_cmd("Performance.enable", {"timeDomain": "timeTicks"})
+    return True
+
+
+def _read_cdp_metrics(driver):
+    if not hasattr(driver, "execute_cdp_cmd"):
+        return {}
+    return {metric["name"]: metric["value"]
+            for metric in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+            if metric["name"] in CDP_METRICS}
+
+
+def start_measurement(driver):
+    """
+    Marks the start of a test on the current page: clears the recorded long tasks and
+    snapshots the document's time origin and the cumulative CDP counters.
+
+    Returns:
+        dict: The snapshot to pass to collect_metrics.
+    """
+    return {"timeOrigin": driver.execute_script(START_MEASUREMENT_SCRIPT), "cdp": _read_cdp_metrics(driver)}
+
+
+def collect_metrics(driver, start=None):
+    """
+    Collects the rendering performance of the current page.
+
+    Timings are in milliseconds from the start of the navigation; CDP metrics keep
+    their own units (bytes, counts and seconds for the *Duration metrics).
+
+    Args:
+        driver (WebDriver): The browser.
+        start (dict, optional): Snapshot from start_measurement. With it, navigation and paint
+            timings are only reported when the test navigated to a new document, and the
+            cumulative CDP counters are reported as the increase since the snapshot.
+
+    Returns:
+        dict: Flat metric name -> value mapping, plus the page 'url'.
+    """
+    timings = driver.execute_script(READ_TIMINGS_SCRIPT)
+    metrics = {"url": timings["url"]}
+    navigated = start is None or timings["timeOrigin"] != start["timeOrigin"]
+
+    navigation = timings["navigation"] if navigated else None
+    if navigation:
+        metrics.update({
+            "navigation.ttfb": navigation["responseStart"] - navigation["requestStart"],
+            "navigation.domInteractive": navigation["domInteractive"],
+            "navigation.domContentLoaded": navigation["domContentLoadedEventEnd"],
+            "navigation.load": navigation["loadEventEnd"],
+            "navigation.transferSize": navigation.get("transferSize", 0),
+        })
+    for name, start_time in timings["paint"] if navigated else ():
+        metrics[f"paint.{name}"] = start_time
+
+    long_tasks = timings["longTasks"]
+    metrics["longtasks.count"] = len(long_tasks)
+    metrics["longtasks.total"] = sum(task["duration"] for task in long_tasks)
+    metrics["longtasks.max"] = max((task["duration"] for task in long_tasks), default=0)
+
+    start_cdp = start["cdp"] if start else {}
+    for name, value in _read_cdp_metrics(driver).items():
+        if name in CUMULATIVE_CDP_METRICS and name in start_cdp and value >= start_cdp[name]:
+            value -= start_cdp[name]  # a lower value means a new renderer restarted the counters
+        metrics[f"cdp.{name}"] = value
+
+    return {name: round(value, 3) if isinstance(value, float) else value for name, value in metrics.items()}
+
+
+def collect_page_load(driver):
+    """
+    Collects the Navigation and Paint Timing of the document that was just loaded
+    (the base page opened when a session starts or is recycled).
+
+    Returns:
+        dict: The page 'url' and its navigation.* and paint.* metrics.
+    """
+    return {name: value for name, value in collect_metrics(driver).items()
+            if name == "url" or name.startswith(("navigation.", "paint."))}
+
+
+def read_budgets(file_path):
+    """
+    Reads performance budgets from a CSV file with the columns url,metric,max.
+    A url of '*' applies to every page; otherwise it matches pages whose URL starts with it.
+
+    Returns:
+        list: (url, metric, max value) tuples.
+    """
+    if not os.path.exists(file_path):
+        return []
+    with open(file_path, mode='r') as file:
+        return [(row["url"], row["metric"], float(row["max"])) for row in csv.DictReader(file)]
+
+
+def check_budgets(metrics, budgets):
+    """
+    Compares collected metrics with the budgets that apply to the page.
+
+    Returns:
+        list: One message per exceeded budget.
+    """
+    violations = []
+    url = metrics.get("url", "")
+    for budget_url, metric, maximum in budgets:
+        if budget_url != "*" and not url.startswith(budget_url):
+            continue
+        value = metrics.get(metric)
+        if value is not None and value > maximum:
+            violations.append(f"{metric} = {value} exceeds the budget of {maximum:g} for {url}")
+    return violations
@@ -0,0 +1,182 @@
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from utilities.environment import setup_browser
+from utilities.lazy import LazyImport
+
+psutil = LazyImport("psutil")
+
+PRIMED_MARKER = ".primed"
+LOCK_OWNER = "owner"
+
+# Files Chrome uses to lock a profile to one running browser; never carried into a clone
+LOCK_FILES = {"SingletonLock", "SingletonSocket", "SingletonCookie", "lockfile", "LOCK"}
+
+
+def prime_profile(template_dir, url, wait_timeout=300):
+    """
+    Launches Chrome once on template_dir and loads the URL so the HTTP, DNS and code
+    caches of the profile are warm. The template is only primed once.
+
+    Args:
+        template_dir (str): user-data-dir to prime.
+        url (str): Page whose assets should be cached.
+        wait_timeout (float): Seconds to wait when another worker is already priming the template.
+
+    Returns:
+        str: The template directory.
+    """
+    lock_dir = template_dir.rstrip(os.sep) + ".lock"
+    deadline = time.monotonic() + wait_timeout
+    while not is_primed(template_dir):
+        try:
+            os.makedirs(lock_dir)
+        except FileExistsError:
+            # Another worker is priming the template: wait for it, unless it died while priming
+            if _is_stale_lock(lock_dir, wait_timeout):
+                print(f"[WARN] Removing stale profile lock {lock_dir} left by a killed priming process.")
+                shutil.rmtree(lock_dir, ignore_errors=True)
+            elif time.monotonic() >= deadline:
+                print(f"[WARN] Profile template {template_dir} was not primed; starting from a cold profile.")
+                return template_dir
+            else:
+                time.sleep(0.5)
+            continue
+        with open(os.path.join(lock_dir, LOCK_OWNER), mode="w") as file:
+            file.write(f"{socket.gethostname()} {os.getpid()}")
+        break
+    else:
+        return template_dir
+
+    try:
+        if is_primed(template_dir):  # primed by another worker while the lock was being taken
+            return template_dir
+        os.makedirs(template_dir, exist_ok=True)
+        start = time.perf_counter()
+        driver = setup_browser(profile_dir=template_dir)
+        try:
+            driver.get(url)
+            driver.execute_script("return document.readyState")
+        finally:
+            driver.quit()
+        with open(os.path.join(template_dir, PRIMED_MARKER), mode="w") as file:
+            file.write(url)
+        print(f"[INFO] Primed profile template {template_dir} with {url} in {time.perf_counter() - start:.2f}s")
+    finally:
+        shutil.rmtree(lock_dir, ignore_errors=True)
+    return template_dir
+
+
+def _is_stale_lock(lock_dir, max_age):
+    """
+    Tells whether a priming lock was left behind: its owner process on this host is gone,
+    or (when the owner is unknown or on another host) it is older than max_age seconds.
+    """
+    try:
+        with open(os.path.join(lock_dir, LOCK_OWNER), mode="r") as file:
+            host, pid = file.read().split()
+        if host == socket.gethostname():
+            return not psutil.pid_exists(int(pid))
+    except (OSError, ValueError):
+        pass
+    try:
+        return time.time() - os.path.getmtime(lock_dir) > max_age
+    except OSError:
+        return False
+
+
+def is_primed(template_dir):
+    """
+    Returns True when the template has already been primed.
+    """
+    return os.path.exists(os.path.join(template_dir, PRIMED_MARKER))
+
+
+def clone_profile(template_dir, clone_dir, strategy="auto"):
+    """
+    Clones a primed template into a private user-data-dir for one browser.
+
+    Args:
+        template_dir (str): The primed template.
+        clone_dir (str): Destination; replaced if it already exists.
+        strategy (str): 'auto' tries a copy-on-write (reflink) clone and falls back to a
+            plain copy; 'copy' always copies. Files are never hardlinked: Chrome rewrites its
+            databases and cache entries in place, which would leak between sessions and into the template.
+
+    Returns:
+        str: The strategy that was used ('reflink' or 'copy').
+    """
+    if os.path.exists(clone_dir):
+        shutil.rmtree(clone_dir, ignore_errors=True)
+    os.makedirs(os.path.dirname(os.path.abspath(clone_dir)), exist_ok=True)
+    start = time.perf_counter()
+
+    if strategy != "copy" and _reflink_copy(template_dir, clone_dir):
+        used = "reflink"
+        for root, _, files in os.walk(clone_dir):
+            for name in LOCK_FILES.intersection(files):
+                os.remove(os.path.join(root, name))
+    else:
+        used = "copy"
+        shutil.copytree(template_dir, clone_dir, ignore=_ignore_lock_files, symlinks=True)
+
+    print(f"[INFO] Cloned profile template into {clone_dir} ({used}) in {time.perf_counter() - start:.2f}s")
+    return used
+
+
+def _ignore_lock_files(directory, names):
+    return [name for name in names if name in LOCK_FILES]
+
+
+def _reflink_copy(source, destination):
+    """
+    Copies a directory with copy-on-write clones (Btrfs/XFS via GNU cp, APFS via cp -c).
+    Returns False when the filesystem or platform doesn't support it.
+    """
+    if sys.platform == "darwin":
+        command = ["cp", "-c", "-R", source, destination]
+    elif sys.platform.startswith("linux"):
+        command = ["cp", "-a", "--reflink=always", source, destination]
+    else:
+        return False
+    try:
+        result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        return False
+    if result.returncode != 0:
+        shutil.rmtree(destination, ignore_errors=True)
+        return False
+    return True
+
+
+def worker_profile(template_dir, url, worker="main", strategy="auto"):
+    """
+    Primes the template if needed and returns a fresh clone for this worker.
+    """
+    prime_profile(template_dir, url)
+    clone_dir = os.path.join(template_dir.rstrip(os.sep) + "-clones", worker)
+    clone_profile(template_dir, clone_dir, strategy=strategy)
+    return clone_dir
+
+
+def reset_browser_cache(driver, cookies=True, storage=False, origin=None):
+    """
+    Brings a warm-profile session back to a cold state for tests that need one.
+
+    Args:
+        driver (WebDriver): A local Chromium driver (CDP is required; for remote sessions
+            start a new session instead, see the cold_cache fixture in conftest.py).
+        cookies (bool): Also clear cookies.
+        storage (bool): Also clear local storage, IndexedDB, service workers and cache storage of the origin.
+        origin (str, optional): Origin to clear storage for; defaults to the current page's origin.
+    """
+    driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+    if cookies:
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    if storage:
+        origin = origin or driver.execute_script("return window.location.origin")
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": origin, "storageTypes": "all"})
+    print("[INFO] Browser cache reset to a cold state.")
@@ -0,0 +1,188 @@
+import threading
+import time
+
+import urllib3
+from selenium.webdriver.remote.client_config import ClientConfig
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+
+class PooledRemoteConnection(RemoteConnection):
+    """
+    RemoteConnection that shares one tuned, keep-alive urllib3 pool between every session.
+
+    Selenium normally builds a new PoolManager per driver and clears it on quit, so each
+    session pays for its own TCP handshakes. Here all sessions talking to the same W3C
+    endpoint (a grid node or a locally started chromedriver) reuse the same sockets, and
+    every command's latency is recorded in ``CommandStats``.
+
+    The pool is built by Selenium itself, so the proxy and TLS settings of the ClientConfig
+    (ProxyManager, ca_certs, ignore_certificates) still apply; one pool is shared per such setup.
+    """
+
+    _pool_managers = {}
+    _pool_lock = threading.Lock()
+
+    pool_size = 32
+    pool_timeout = urllib3.Timeout(connect=10, read=120)
+
+    def __init__(self, remote_server_addr, stats=None, client_config=None):
+        """
+        Args:
+            remote_server_addr (str): URL of the W3C endpoint.
+            stats (CommandStats, optional): Receives the latency of every command (default: COMMAND_STATS).
+            client_config (ClientConfig, optional): Proxy, TLS and auth settings; without one the
+                endpoint is reached with the pool's connect/read timeouts.
+        """
+        super().__init__(client_config=client_config or ClientConfig(
+            remote_server_addr=remote_server_addr, keep_alive=True, timeout=self.pool_timeout,
+        ))
+        self.stats = stats or COMMAND_STATS
+
+    @classmethod
+    def configure_pool(cls, pool_size=None, connect_timeout=None, read_timeout=None):
+        """
+        Tunes the shared pool. Must be called before the first remote session is started.
+
+        Args:
+            pool_size (int, optional): Maximum number of idle keep-alive connections per endpoint.
+            connect_timeout (float, optional): Seconds to wait for a TCP connection.
+            read_timeout (float, optional): Seconds to wait for a command's response.
+
+        The timeouts go into the ClientConfig of every new connection, since Selenium passes
+        that timeout with each request (overriding the pool's own).
+        """
+        if pool_size:
+            cls.pool_size = pool_size
+        if connect_timeout or read_timeout:
+            cls.pool_timeout = urllib3.Timeout(
+                connect=connect_timeout or cls.pool_timeout.connect_timeout,
+                read=read_timeout or cls.pool_timeout.read_timeout,
+            )
+
+    def _get_connection_manager(self):
+        """
+        Returns the pool shared by every session with the same proxy and TLS settings, creating it on first use.
+        """
+        config = self._client_config
+        key = (self._proxy_url, config.ca_certs, config.ignore_certificates)
+        with self._pool_lock:
+            manager = self._pool_managers.get(key)
+            if manager is None:
+                manager = super()._get_connection_manager()
+                manager.connection_pool_kw.update(
+                    maxsize=self.pool_size,
+                    block=False,  # never make a session wait for a socket; extra connections are simply not kept
+                    retries=False,
+                )
+                manager.headers.update({"Connection": "keep-alive"})
+                self._pool_managers[key] = manager
+            return manager
+
+    def execute(self, command, params):
+        start = time.perf_counter()
+        try:
+            return super().execute(command, params)
+        finally:
+            self.stats.add(command, time.perf_counter() - start)
+
+    def close(self):
+        """
+        Leaves the shared pool open for the other sessions (Selenium's default clears it on quit).
+        """
+
+    @classmethod
+    def connection_stats(cls):
+        """
+        Summarises socket reuse of the shared pool.
+
+        Returns:
+            dict: Requests sent, new connections opened and the share of requests that reused a socket.
+        """
+        requests = connections = 0
+        for manager in list(cls._pool_managers.values()):
+            for key in list(manager.pools.keys()):
+                pool = manager.pools.get(key)
+                if pool is not None:
+                    requests += pool.num_requests
+                    connections += pool.num_connections
+        reuse = (1 - connections / requests) if requests else 0.0
+        return {"requests": requests, "connections": connections, "reuse_rate": round(reuse, 4)}
+
+
+class CommandStats:
+    """
+    Thread-safe per-command latency counters (count, total, max) for remote sessions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._commands = {}
+
+    def add(self, command, duration):
+        with self._lock:
+            count, total, maximum = self._commands.get(command, (0, 0.0, 0.0))
+            self._commands[command] = (count + 1, total + duration, max(maximum, duration))
+
+    def export(self):
+        """
+        Returns:
+            dict: command -> [count, total seconds, max seconds], as plain data.
+        """
+        with self._lock:
+            return {command: list(values) for command, values in self._commands.items()}
+
+    def merge(self, commands):
+        """
+        Adds the counters exported by another process (see export).
+        """
+        with self._lock:
+            for command, (count, total, maximum) in commands.items():
+                own_count, own_total, own_maximum = self._commands.get(command, (0, 0.0, 0.0))
+                self._commands[command] = (own_count + count, own_total + total, max(own_maximum, maximum))
+
+    def summary(self):
+        """
+        Returns:
+            list: (command, count, average ms, max ms) tuples, slowest average first.
+        """
+        with self._lock:
+            rows = [
+                (command, count, 1000 * total / count, 1000 * maximum)
+                for command, (count, total, maximum) in self._commands.items()
+            ]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+COMMAND_STATS = CommandStats()
+
+
+def export_remote_stats():
+    """
+    Returns the connection and command stats of this process as plain data
+    (sent by xdist workers to the controller).
+    """
+    return {"connections": PooledRemoteConnection.connection_stats(), "commands": COMMAND_STATS.export()}
+
+
+def print_remote_stats(write_line=print, worker_stats=()):
+    """
+    Prints connection reuse and per-command latency of the remote sessions of this
+    process and of the xdist workers (see export_remote_stats).
+    """
+    commands = CommandStats()
+    stats = PooledRemoteConnection.connection_stats()
+    commands.merge(COMMAND_STATS.export())
+    for worker in worker_stats:
+        commands.merge(worker["commands"])
+        stats["requests"] += worker["connections"]["requests"]
+        stats["connections"] += worker["connections"]["connections"]
+    rows = commands.summary()
+    if not rows:
+        return
+    stats["reuse_rate"] = (1 - stats["connections"] / stats["requests"]) if stats["requests"] else 0.0
+    write_line(
+        f"[INFO] Remote WebDriver: {stats['requests']} requests over {stats['connections']} connections "
+        f"({100 * stats['reuse_rate']:.1f}% reused)"
+    )
+    for command, count, average, maximum in rows:
+        write_line(f"[INFO]   {command:<28} {count:6d} calls {average:8.1f} ms avg {maximum:8.1f} ms max")
@@ -0,0 +1,265 @@
+import argparse
+import glob
+import html
+import json
+import os
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+
+THUMBNAIL_SIZE = (320, 200)
+
+
+class StreamingReport:
+    """
+    Streams one JSON line per test result to disk as soon as the result is known.
+
+    Every shard (a plain run, an xdist worker or a CI job) writes its own
+    ``results-<shard>.jsonl`` file, so shards never contend for the same file
+    and can be merged into a single report afterwards with ``merge_shards``.
+    """
+
+    def __init__(self, output_dir, shard="main"):
+        self.output_dir = output_dir
+        self.shard = shard
+        self.thumbnails_dir = os.path.join(output_dir, "thumbnails")
+        os.makedirs(self.thumbnails_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, f"results-{shard}.jsonl")
+        self._file = open(self.path, mode="w", encoding="utf-8")
+
+    def record(self, report, screenshot=None, **fields):
+        """
+        Appends a single test result to the shard file and flushes it.
+
+        Args:
+            report (TestReport): The pytest report for the test phase.
+            screenshot (str, optional): Path of the screenshot captured for the test.
+            **fields: Extra values to store with the result (e.g. metrics).
+
+        Returns:
+            dict: The record that was written.
+        """
+        record = {
+            "nodeid": report.nodeid,
+            "name": report.nodeid.split("::")[-1],
+            "shard": self.shard,
+            "when": report.when,
+            "outcome": _outcome(report),
+            "duration": round(report.duration, 4),
+            "timestamp": time.time(),
+            "message": report.longreprtext if report.failed else "",
+            # Paths are relative to the shard directory so shards merge anywhere (see iter_results)
+            "screenshot": self._relative(screenshot),
+            "thumbnail": self._relative(make_thumbnail(screenshot, self.thumbnails_dir) if screenshot else None),
+        }
+        record.update(fields)
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+        return record
+
+    def _relative(self, path):
+        return _relative(path, self.output_dir)
+
+    def close(self):
+        """
+        Closes the shard file.
+        """
+        if not self._file.closed:
+            self._file.close()
+
+
+def _outcome(report):
+    """
+    Maps a pytest report to the outcome shown in the report ('error' for setup/teardown failures).
+    """
+    if report.failed and report.when != "call":
+        return "error"
+    if hasattr(report, "wasxfail"):
+        return "xpassed" if report.passed else "xfailed"
+    return report.outcome
+
+
+def make_thumbnail(image_path, thumbnails_dir, size=THUMBNAIL_SIZE):
+    """
+    Creates a small JPEG thumbnail for a screenshot.
+
+    Returns:
+        str: Path of the thumbnail, or None when Pillow is not installed or the image can't be read.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    thumbnail_path = os.path.join(thumbnails_dir, os.path.splitext(os.path.basename(image_path))[0] + ".jpg")
+    try:
+        with Image.open(image_path) as image:
+            image.thumbnail(size)
+            image.convert("RGB").save(thumbnail_path, "JPEG", quality=70)
+    except OSError as e:
+        print(f"[WARN] Could not create thumbnail for {image_path}: {e}")
+        return None
+    return thumbnail_path
+
+
+def iter_results(paths):
+    """
+    Yields the records of one or more shard files, one at a time, with their
+    screenshot and thumbnail paths resolved against the shard file's directory.
+    """
+    for path in paths:
+        shard_dir = os.path.dirname(os.path.abspath(path))
+        with open(path, mode="r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    record = json.loads(line)
+                    for key in ("screenshot", "thumbnail"):
+                        if record.get(key):
+                            record[key] = os.path.normpath(os.path.join(shard_dir, record[key]))
+                    yield record
+
+
+def load_results(paths):
+    """
+    Loads and merges the records of several shard files.
+
+    When a test appears more than once (e.g. a call failure followed by a teardown
+    error) the worst outcome wins, so the merged report has one row per test.
+    """
+    severity = {"passed": 0, "skipped": 1, "xfailed": 1, "xpassed": 2, "failed": 3, "error": 4}
+    merged = {}
+    for record in iter_results(paths):
+        previous = merged.get(record["nodeid"])
+        if previous is None:
+            merged[record["nodeid"]] = record
+            continue
+        message = "\n\n".join(text for text in (previous["message"], record["message"]) if text)
+        if severity.get(record["outcome"], 0) > severity.get(previous["outcome"], 0):
+            record["screenshot"] = record["screenshot"] or previous["screenshot"]
+            record["thumbnail"] = record["thumbnail"] or previous["thumbnail"]
+            merged[record["nodeid"]] = record
+        merged[record["nodeid"]]["duration"] = round(previous["duration"] + record["duration"], 4)
+        merged[record["nodeid"]]["message"] = message
+    return sorted(merged.values(), key=lambda record: record["nodeid"])
+
+
+def _relative(path, start):
+    if not path:
+        return None
+    return os.path.relpath(path, start).replace(os.sep, "/")
+
+
+def write_html(results, html_path):
+    """
+    Writes a lightweight HTML report with one row per test.
+
+    Screenshots are not embedded: each row shows a lazily loaded thumbnail that
+    links to the full-size image, so the report stays small and opens quickly
+    regardless of the number of tests.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(html_path)), exist_ok=True)
+    base_dir = os.path.dirname(os.path.abspath(html_path))
+    counts = {}
+    for record in results:
+        counts[record["outcome"]] = counts.get(record["outcome"], 0) + 1
+    summary = ", ".join(f"{count} {outcome}" for outcome, count in sorted(counts.items()))
+
+    with open(html_path, mode="w", encoding="utf-8") as file:
+        file.write(
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"/><title>Test Report</title>\n"
+            "<style>body{font-family:Helvetica,Arial,sans-serif;font-size:12px}"
+            "table{border-collapse:collapse;width:100%}td,th{border:1px solid #e6e6e6;padding:4px;vertical-align:top}"
+            ".passed{color:green}.skipped,.xfailed{color:orange}.failed,.error,.xpassed{color:red}"
+            "img{max-width:320px;max-height:200px}pre{white-space:pre-wrap;margin:0}</style></head><body>\n"
+        )
+        file.write(f"<h1>Test Report</h1>\n<p>{len(results)} tests: {html.escape(summary)}</p>\n")
+        file.write("<table><tr><th>Result</th><th>Test</th><th>Shard</th><th>Duration (s)</th><th>Screenshot</th><th>Details</th></tr>\n")
+        for record in results:
+            screenshot = _relative(record.get("screenshot"), base_dir)
+            thumbnail = _relative(record.get("thumbnail"), base_dir)
+            if screenshot and thumbnail:
+                image = f"<a href=\"{html.escape(screenshot)}\"><img loading=\"lazy\" src=\"{html.escape(thumbnail)}\"/></a>"
+            elif screenshot:
+                image = f"<a href=\"{html.escape(screenshot)}\">screenshot</a>"
+            else:
+                image = ""
+            file.write(
+                f"<tr><td class=\"{record['outcome']}\">{record['outcome']}</td>"
+                f"<td>{html.escape(record['nodeid'])}</td><td>{html.escape(str(record.get('shard', '')))}</td>"
+                f"<td>{record['duration']}</td><td>{image}</td>"
+                f"<td><pre>{html.escape(record.get('message') or '')}</pre></td></tr>\n"
+            )
+        file.write("</table></body></html>\n")
+    print(f"[INFO] HTML report saved at: {html_path}")
+
+
+def write_junit(results, xml_path, suite_name="pytest"):
+    """
+    Writes the results as a JUnit XML file.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(xml_path)), exist_ok=True)
+    failures = sum(1 for record in results if record["outcome"] in ("failed", "xpassed"))
+    errors = sum(1 for record in results if record["outcome"] == "error")
+    skipped = sum(1 for record in results if record["outcome"] in ("skipped", "xfailed"))
+    total_time = sum(record["duration"] for record in results)
+
+    with open(xml_path, mode="w", encoding="utf-8") as file:
+        file.write("<?xml version=\"1.0\" encoding=\"utf-8\"?>\n<testsuites>\n")
+        file.write(
+            f"<testsuite name={quoteattr(suite_name)} tests=\"{len(results)}\" failures=\"{failures}\" "
+            f"errors=\"{errors}\" skipped=\"{skipped}\" time=\"{total_time:.3f}\">\n"
+        )
+        for record in results:
+            module, _, name = record["nodeid"].rpartition("::")
+            classname = module.replace("/", ".").replace(".py", "")
+            file.write(f"<testcase classname={quoteattr(classname)} name={quoteattr(name)} time=\"{record['duration']:.3f}\"")
+            message = escape(record.get("message") or "")
+            if record["outcome"] in ("failed", "xpassed"):
+                file.write(f"><failure message=\"test failed\">{message}</failure></testcase>\n")
+            elif record["outcome"] == "error":
+                file.write(f"><error message=\"test error\">{message}</error></testcase>\n")
+            elif record["outcome"] in ("skipped", "xfailed"):
+                file.write(f"><skipped message=\"{record['outcome']}\"/></testcase>\n")
+            else:
+                file.write("/>\n")
+        file.write("</testsuite>\n</testsuites>\n")
+    print(f"[INFO] JUnit XML report saved at: {xml_path}")
+
+
+def merge_shards(shard_dir, html_path=None, junit_path=None, since=None):
+    """
+    Merges every ``results-*.jsonl`` file in a directory and writes the combined reports.
+
+    Args:
+        shard_dir (str): Directory containing the shard files.
+        html_path (str, optional): Where to write the HTML report.
+        junit_path (str, optional): Where to write the JUnit XML report.
+        since (float, optional): Only merge shard files modified after this timestamp.
+
+    Returns:
+        list: The merged records.
+    """
+    paths = sorted(glob.glob(os.path.join(shard_dir, "results-*.jsonl")))
+    if since is not None:
+        paths = [path for path in paths if os.path.getmtime(path) >= since]
+    results = load_results(paths)
+    if html_path:
+        write_html(results, html_path)
+    if junit_path:
+        write_junit(results, junit_path)
+    print(f"[INFO] Merged {len(results)} results from {len(paths)} shard(s) in {shard_dir}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Merge streamed test results into HTML and JUnit XML reports.")
+    parser.add_argument("shard_dir", help="Directory containing results-*.jsonl shard files")
+    parser.add_argument("--html", default="reports/summary.html", help="Path of the merged HTML report")
+    parser.add_argument("--junit", default="reports/junit.xml", help="Path of the merged JUnit XML report")
+    args = parser.parse_args(argv)
+    merge_shards(args.shard_dir, html_path=args.html, junit_path=args.junit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import functools
+import time
+from selenium.common.exceptions import (
+    NoAlertPresentException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from utilities.hang import CommandHangError
+
+
+RETRYABLE_EXCEPTIONS = (TimeoutException, StaleElementReferenceException)
+FATAL_EXCEPTIONS = (AssertionError, CommandHangError)
+
+
+def is_retryable(error):
+    """
+    Tells whether an error is transient and worth retrying.
+
+    Actions usually wrap the original error (raise Exception(f"[FAIL] ...: {e}")), so the
+    whole chain of causes is inspected: an assertion error anywhere in it is a real failure,
+    a Selenium timeout or stale element reference is transient.
+    """
+    chain = []
+    while error is not None and error not in chain:
+        chain.append(error)
+        error = error.__cause__ or error.__context__
+    if any(isinstance(item, FATAL_EXCEPTIONS) for item in chain):
+        return False
+    return any(isinstance(item, RETRYABLE_EXCEPTIONS) for item in chain)
+
+
+def reset_page_state(driver, main_handle=None):
+    """
+    Brings the page back to a usable state between attempts without reloading it:
+    accepts a leftover alert, closes every window but the main one and leaves any iFrame.
+
+    Args:
+        driver (WebDriver): The browser.
+        main_handle (str, optional): Handle of the window to keep (see page_state_reset). The order of
+            window_handles is up to the driver, so the first handle is only a fallback.
+    """
+    try:
+        driver.switch_to.alert.accept()
+        print("[INFO] Accepted a leftover alert.")
+    except NoAlertPresentException:
+        pass
+    handles = driver.window_handles
+    keep = main_handle if main_handle in handles else handles[0]
+    for handle in handles:
+        if handle != keep:
+            driver.switch_to.window(handle)
+            driver.close()
+    driver.switch_to.window(keep)
+    driver.switch_to.default_content()
+
+
+def page_state_reset(driver):
+    """
+    Remembers the current window and returns a reset for RetryPolicy that keeps it.
+    Create it before the action or test runs, while the main window is still the current one.
+    """
+    try:
+        main_handle = driver.current_window_handle
+    except WebDriverException:
+        main_handle = None
+    return lambda: reset_page_state(driver, main_handle)
+
+
+class RetryPolicy:
+    """
+    Bounded retries with exponential backoff for transient WebDriver failures.
+    """
+
+    def __init__(self, retries=1, backoff=0.25, max_backoff=2.0, reset=None, stats=None):
+        """
+        Args:
+            retries (int): Extra attempts after the first one (0 disables retrying).
+            backoff (float): Seconds to wait before the first retry; doubled for every further retry.
+            max_backoff (float): Upper bound of the wait between attempts.
+            reset (callable, optional): Called before every retry to reset the page state.
+            stats (FlakinessStats, optional): Receives the outcome of every retried call.
+        """
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.reset = reset
+        self.stats = stats
+
+    def run(self, function, *args, name=None, scope="action", **kwargs):
+        """
+        Calls the function, retrying it on transient errors. Other errors are raised immediately.
+        """
+        name = name or function.__name__
+        attempt = 0
+        while True:
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.retries or not is_retryable(e):
+                    if attempt and self.stats:
+                        self.stats.add(scope, name, attempt, recovered=False)
+                    raise
+                attempt += 1
+                delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+                print(f"[WARN] Transient failure in {name} ({type(e).__name__}), retry {attempt}/{self.retries} in {delay:.2f}s")
+                time.sleep(delay)
+                if self.reset:
+                    try:
+                        self.reset()
+                    except Exception as reset_error:
+                        print(f"[WARN] Could not reset the page state: {reset_error}")
+                continue
+            if attempt and self.stats:
+                self.stats.add(scope, name, attempt, recovered=True)
+            return result
+
+
+class FlakinessStats:
+    """
+    Counts the retries of each action and test: how often they needed a retry and
+    how often the retry recovered them.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def add(self, scope, name, retries, recovered):
+        self.events.append({"scope": scope, "name": name, "retries": retries, "recovered": recovered})
+
+    def summary(self):
+        """
+        Returns:
+            list: (scope, name, retried calls, recovered calls, total retries) tuples, most retried first.
+        """
+        totals = {}
+        for event in self.events:
+            key = (event["scope"], event["name"])
+            calls, recovered, retries = totals.get(key, (0, 0, 0))
+            totals[key] = (calls + 1, recovered + event["recovered"], retries + event["retries"])
+        rows = [(scope, name, calls, recovered, retries) for (scope, name), (calls, recovered, retries) in totals.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+def retry_actions(actions, policy):
+    """
+    Retries every public method of an Actions instance according to the policy.
+
+    Only the outermost action call is retried: when handle_suggestion_class calls
+    enter_text_for_suggestions, a transient failure restarts handle_suggestion_class
+    instead of multiplying the attempts at every level.
+
+    Returns:
+        Actions: The same instance.
+    """
+    depth = [0]
+
+    def retried(name, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            depth[0] += 1
+            try:
+                if depth[0] > 1:
+                    return method(*args, **kwargs)
+                return policy.run(method, *args, name=name, **kwargs)
+            finally:
+                depth[0] -= 1
+        return wrapper
+
+    for name in dir(type(actions)):
+        if not name.startswith("_") and callable(getattr(type(actions), name)):
+            setattr(actions, name, retried(name, getattr(actions, name)))
+    return actions
@@ -0,0 +1,169 @@
+import csv
+import os
+import time
+from selenium.common.exceptions import TimeoutException
+from locators.locators import Locators
+from utilities.lazy import LazyImport
+
+By = LazyImport("selenium.webdriver.common.by", "By")
+Select = LazyImport("selenium.webdriver.support.ui", "Select")
+WebDriverWait = LazyImport("selenium.webdriver.support.ui", "WebDriverWait")
+
+
+# Returns the texts of the visible autocomplete suggestions in one round trip
+READ_SUGGESTIONS_SCRIPT = """
+return Array.from(document.querySelectorAll('li.ui-menu-item div'))
+    .filter(function (item) { return item.offsetParent !== null; })
+    .map(function (item) { return item.textContent.trim(); });
+"""
+
+# Clears the autocomplete input and closes its menu without reloading the page
+RESET_SUGGESTIONS_SCRIPT = """
+var input = arguments[0];
+input.value = '';
+if (window.jQuery && jQuery(input).autocomplete('instance')) { jQuery(input).autocomplete('close'); }
+"""
+
+# Returns every option of a <select> as [value, text] pairs in one round trip
+READ_OPTIONS_SCRIPT = """
+return Array.from(arguments[0].options).map(function (option) { return [option.value, option.text.trim()]; });
+"""
+
+READ_SELECTED_SCRIPT = """
+var select = arguments[0];
+return [select.selectedIndex, select.value, select.options[select.selectedIndex].text.trim()];
+"""
+
+
+class SweepResult:
+    """
+    Outcome of a sweep: the number of cases, the failures and the throughput.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.cases = 0
+        self.failures = []
+        self.seconds = 0.0
+
+    @property
+    def throughput(self):
+        """
+        Cases per second.
+        """
+        return self.cases / self.seconds if self.seconds else 0.0
+
+    def as_dict(self):
+        """
+        Returns:
+            dict: The outcome as plain data (attached to the test result as the 'sweep' property).
+        """
+        return {"name": self.name, "cases": self.cases, "failures": len(self.failures),
+                "seconds": round(self.seconds, 3), "throughput": round(self.throughput, 2)}
+
+    def summary(self):
+        return (f"{self.name}: {self.cases} cases, {len(self.failures)} failed in {self.seconds:.2f}s "
+                f"({self.throughput:.1f} cases/s)")
+
+
+def read_sweep_cases(file_path):
+    """
+    Reads sweep cases from a CSV file (one case per row) and returns them as dictionaries.
+    """
+    absolute_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), file_path)
+    with open(absolute_path, mode='r') as file:
+        cases = list(csv.DictReader(file))
+    print(f"[PASS] Successfully read {len(cases)} sweep cases from CSV file: {file_path}")
+    return cases
+
+
+class SuggestionSweep:
+    """
+    Sweeps the autocomplete across many (prefix, expected country) cases on one page.
+
+    Between cases the input is cleared with a script instead of reloading the page, and
+    each case verifies all visible suggestions with a single script call.
+    """
+
+    def __init__(self, driver, input_locator=Locators.SUGGESTION_CLASS_EXAMPLE_INPUT, timeout=3):
+        self.driver = driver
+        self.input_locator = input_locator
+        self.timeout = timeout
+
+    def run(self, cases):
+        """
+        Types every prefix and checks that the expected country is suggested.
+
+        Args:
+            cases (list): Dictionaries with the keys 'prefix' and 'country'.
+
+        Returns:
+            SweepResult: The sweep outcome.
+        """
+        result = SweepResult("Suggestion sweep")
+        input_element = self.driver.find_element(By.XPATH, self.input_locator)
+        start = time.perf_counter()
+
+        for case in cases:
+            prefix, country = case["prefix"], case["country"]
+            self.driver.execute_script(RESET_SUGGESTIONS_SCRIPT, input_element)
+            input_element.send_keys(prefix)
+            suggestions = self._wait_for_suggestion(country)
+            result.cases += 1
+            if country not in suggestions:
+                result.failures.append(f"'{prefix}' did not suggest '{country}' (got: {', '.join(suggestions) or 'nothing'})")
+
+        self.driver.execute_script(RESET_SUGGESTIONS_SCRIPT, input_element)
+        result.seconds = time.perf_counter() - start
+        print(f"[INFO] {result.summary()}")
+        return result
+
+    def _wait_for_suggestion(self, country):
+        """
+        Polls the suggestions until the expected country shows up or the timeout expires.
+        Returns the last list of suggestions read.
+        """
+        last_read = []
+
+        def expected_suggested(driver):
+            last_read[:] = driver.execute_script(READ_SUGGESTIONS_SCRIPT)
+            return country in last_read
+
+        try:
+            WebDriverWait(self.driver, self.timeout, poll_frequency=0.05).until(expected_suggested)
+        except TimeoutException:
+            pass
+        return list(last_read)
+
+
+class DropdownSweep:
+    """
+    Selects every option of a dropdown in turn and verifies the selection.
+    """
+
+    def __init__(self, driver, dropdown_locator=Locators.DROPDOWN):
+        self.driver = driver
+        self.dropdown_locator = dropdown_locator
+
+    def run(self):
+        """
+        Returns:
+            SweepResult: The sweep outcome.
+        """
+        result = SweepResult("Dropdown sweep")
+        select_element = self.driver.find_element(By.XPATH, self.dropdown_locator)
+        dropdown = Select(select_element)
+        options = self.driver.execute_script(READ_OPTIONS_SCRIPT, select_element)
+        start = time.perf_counter()
+
+        for index, (value, text) in enumerate(options):
+            dropdown.select_by_index(index)
+            selected_index, selected_value, selected_text = self.driver.execute_script(READ_SELECTED_SCRIPT, select_element)
+            result.cases += 1
+            if (selected_index, selected_value, selected_text) != (index, value, text):
+                result.failures.append(f"Option {index} '{text}' was not selected (got: '{selected_text}')")
+
+        dropdown.select_by_index(0)
+        result.seconds = time.perf_counter() - start
+        print(f"[INFO] {result.summary()}")
+        return result
@@ -0,0 +1,319 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from utilities.lazy import LazyImport
+
+# NumPy and Pillow are only imported when the first image is compared
+np = LazyImport("numpy")
+Image = LazyImport("PIL.Image")
+
+
+BASELINES_DIR = "baselines"
+DIFFS_DIR = os.path.join("reports", "visual_diffs")
+INDEX_FILE = "index.json"
+
+# A pixel counts as changed when any channel differs by more than this
+PIXEL_TOLERANCE = 16
+# The image fails when more than this share of the (unmasked) pixels changed
+MAX_DIFF_RATIO = 0.001
+# Perceptual hashes further apart than this are a gross change; the pixel diff is skipped
+MAX_HASH_DISTANCE = 20
+
+TIMESTAMP_SUFFIX = re.compile(r"_\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}$")
+
+
+def baseline_name(screenshot_path):
+    """
+    Derives the baseline name of a screenshot by dropping its timestamp suffix
+    (e.g. 'screenshots/test_case_web_table_2024-12-03_09-56-56.png' -> 'test_case_web_table').
+    """
+    name = os.path.splitext(os.path.basename(screenshot_path))[0]
+    return TIMESTAMP_SUFFIX.sub("", name)
+
+
+def file_digest(path):
+    with open(path, mode="rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def load_image(path):
+    """
+    Loads an image as an RGB uint8 array of shape (height, width, 3).
+    """
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def dhash(pixels, size=8):
+    """
+    Computes a 64-bit difference hash: the sign of the horizontal gradient of a 9x8 grayscale thumbnail.
+    """
+    gray = Image.fromarray(pixels).convert("L").resize((size + 1, size), Image.BILINEAR)
+    values = np.asarray(gray, dtype=np.int16)
+    bits = (values[:, 1:] > values[:, :-1]).flatten()
+    return int(np.packbits(bits).tobytes().hex(), 16)
+
+
+def hash_distance(first, second):
+    return bin(first ^ second).count("1")
+
+
+def build_mask(shape, ignore_regions):
+    """
+    Builds a boolean mask of the pixels to compare.
+
+    Args:
+        shape (tuple): (height, width) of the image.
+        ignore_regions (list): (x, y, width, height) rectangles to leave out of the comparison.
+    """
+    mask = np.ones(shape, dtype=bool)
+    for x, y, width, height in ignore_regions or ():
+        mask[max(y, 0):y + height, max(x, 0):x + width] = False
+    return mask
+
+
+def apply_mask(pixels, ignore_regions):
+    """
+    Returns a copy of the image with the ignored regions painted black, so they cannot affect its hash.
+    """
+    masked = pixels.copy()
+    masked[~build_mask(pixels.shape[:2], ignore_regions)] = 0
+    return masked
+
+
+def pixel_diff(actual, baseline, ignore_regions=None, tolerance=PIXEL_TOLERANCE):
+    """
+    Compares two images of the same size pixel by pixel.
+
+    Returns:
+        tuple: (boolean array of changed pixels, share of compared pixels that changed)
+    """
+    delta = np.abs(actual.astype(np.int16) - baseline.astype(np.int16)).max(axis=2)
+    mask = build_mask(delta.shape, ignore_regions)
+    changed = (delta > tolerance) & mask
+    compared = int(mask.sum())
+    return changed, (int(changed.sum()) / compared if compared else 0.0)
+
+
+def save_diff_image(actual, changed, path):
+    """
+    Writes the actual image dimmed, with the changed pixels painted red.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    overlay = (actual // 3).astype(np.uint8)
+    overlay[changed] = (255, 0, 0)
+    Image.fromarray(overlay).save(path)
+
+
+def compare_image(name, screenshot_path, baseline_path, baseline_entry=None, ignore_regions=None,
+                  diffs_dir=DIFFS_DIR, max_diff_ratio=MAX_DIFF_RATIO, max_hash_distance=MAX_HASH_DISTANCE):
+    """
+    Compares a screenshot with its baseline. Runs in the worker processes of compare_batch.
+
+    The cheap checks come first: an identical file passes without decoding, and a
+    perceptual hash far from the baseline's fails without a pixel diff.
+
+    Returns:
+        dict: The result ('status' is 'passed', 'failed' or 'new') with the hash and timing.
+    """
+    start = time.perf_counter()
+    result = {"name": name, "screenshot": screenshot_path, "baseline": baseline_path, "diff": None,
+              "diff_ratio": 0.0, "hash_distance": 0}
+    digest = file_digest(screenshot_path)
+    result["sha1"] = digest
+
+    if baseline_entry and baseline_entry.get("sha1") == digest:
+        result.update(status="passed", dhash=baseline_entry["dhash"], reason="identical file")
+    else:
+        actual = load_image(screenshot_path)
+        result["dhash"] = dhash(actual)
+        if not os.path.exists(baseline_path):
+            result.update(status="new", reason="no baseline")
+        else:
+            baseline = None
+            if ignore_regions:
+                # Hash only what is compared, or masked dynamic content would trip the prefilter
+                baseline = load_image(baseline_path)
+                result["hash_distance"] = hash_distance(dhash(apply_mask(actual, ignore_regions)),
+                                                        dhash(apply_mask(baseline, ignore_regions)))
+            else:
+                baseline_hash = baseline_entry["dhash"] if baseline_entry else dhash(load_image(baseline_path))
+                result["hash_distance"] = hash_distance(result["dhash"], baseline_hash)
+            if result["hash_distance"] > max_hash_distance:
+                result.update(status="failed", diff_ratio=1.0, reason="perceptual hash mismatch")
+            else:
+                if baseline is None:
+                    baseline = load_image(baseline_path)
+                if baseline.shape != actual.shape:
+                    result.update(status="failed", diff_ratio=1.0,
+                                  reason=f"size changed from {baseline.shape[1]}x{baseline.shape[0]} "
+                                         f"to {actual.shape[1]}x{actual.shape[0]}")
+                else:
+                    changed, ratio = pixel_diff(actual, baseline, ignore_regions)
+                    result["diff_ratio"] = round(ratio, 6)
+                    if ratio > max_diff_ratio:
+                        result["diff"] = os.path.join(diffs_dir, f"{name}_diff.png")
+                        save_diff_image(actual, changed, result["diff"])
+                        result.update(status="failed", reason=f"{100 * ratio:.3f}% of pixels changed")
+                    else:
+                        result.update(status="passed", reason="within tolerance")
+
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+class VisualBaselines:
+    """
+    Baseline images stored per test or element name, with an index of their hashes
+    so the prefilter never has to decode a baseline.
+    """
+
+    def __init__(self, baselines_dir=BASELINES_DIR, masks_file=None):
+        self.baselines_dir = baselines_dir
+        self.index_path = os.path.join(baselines_dir, INDEX_FILE)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, mode="r", encoding="utf-8") as file:
+                self.index = json.load(file)
+        self.masks = read_masks(masks_file) if masks_file else {}
+
+    def baseline_path(self, name):
+        return os.path.join(self.baselines_dir, f"{name}.png")
+
+    def compare(self, name, screenshot_path, ignore_regions=None, update=False):
+        """
+        Compares one screenshot with its baseline (see compare_batch).
+        """
+        return self.compare_batch([(name, screenshot_path, ignore_regions)], update=update, workers=1)[0]
+
+    def compare_batch(self, items, update=False, workers=None):
+        """
+        Compares many screenshots with their baselines across a process pool.
+
+        Args:
+            items (list): (name, screenshot path, ignore regions or None) tuples.
+            update (bool): Accept the screenshots as the new baselines when they differ or are new.
+            workers (int, optional): Number of processes (default: one per CPU; 1 runs in-process).
+
+        Returns:
+            list: One result dict per item, in the same order.
+        """
+        jobs = [
+            (name, path, self.baseline_path(name), self.index.get(name),
+             ignore_regions if ignore_regions is not None else self.masks.get(name))
+            for name, path, ignore_regions in items
+        ]
+        if workers == 1 or len(jobs) < 2:
+            results = [compare_image(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(compare_image, *zip(*jobs), chunksize=max(1, len(jobs) // 64)))
+
+        for result in results:
+            if result["status"] == "new" or (update and result["status"] == "failed"):
+                self.accept(result)
+        self.save_index()
+        return results
+
+    def accept(self, result):
+        """
+        Stores a compared screenshot as the baseline for its name.
+        """
+        os.makedirs(self.baselines_dir, exist_ok=True)
+        shutil.copyfile(result["screenshot"], result["baseline"])
+        self.index[result["name"]] = {"sha1": result["sha1"], "dhash": result["dhash"]}
+        print(f"[INFO] Stored visual baseline '{result['name']}' at {result['baseline']}")
+
+    def save_index(self):
+        if not self.index:
+            return
+        os.makedirs(self.baselines_dir, exist_ok=True)
+        with open(self.index_path, mode="w", encoding="utf-8") as file:
+            json.dump(self.index, file, indent=2, sort_keys=True)
+
+
+def read_masks(file_path):
+    """
+    Reads ignore regions from a CSV file with the columns name,x,y,width,height.
+
+    Returns:
+        dict: Baseline name -> list of (x, y, width, height) rectangles.
+    """
+    masks = {}
+    with open(file_path, mode="r") as file:
+        for row in csv.DictReader(file):
+            masks.setdefault(row["name"], []).append(
+                (int(row["x"]), int(row["y"]), int(row["width"]), int(row["height"]))
+            )
+    return masks
+
+
+def latest_screenshots(screenshots_dir, since=None):
+    """
+    Picks the most recent screenshot for every baseline name in a directory.
+
+    Args:
+        screenshots_dir (str): Directory to scan.
+        since (float, optional): Ignore screenshots older than this timestamp.
+
+    Returns:
+        list: (name, path) tuples sorted by name.
+    """
+    latest = {}
+    for entry in os.scandir(screenshots_dir):
+        if not entry.name.lower().endswith(".png"):
+            continue
+        modified = entry.stat().st_mtime
+        if since is not None and modified < since:
+            continue
+        name = baseline_name(entry.path)
+        if name not in latest or modified > latest[name][0]:
+            latest[name] = (modified, entry.path)
+    return sorted((name, path) for name, (_, path) in latest.items())
+
+
+def check_screenshots(screenshots_dir="screenshots", baselines_dir=BASELINES_DIR, masks_file=None,
+                      update=False, since=None, workers=None):
+    """
+    Compares the latest screenshot of every name in a directory with its baseline.
+
+    Returns:
+        list: The failed results.
+    """
+    start = time.perf_counter()
+    baselines = VisualBaselines(baselines_dir, masks_file=masks_file)
+    screenshots = latest_screenshots(screenshots_dir, since=since)
+    results = baselines.compare_batch([(name, path, None) for name, path in screenshots],
+                                      update=update, workers=workers)
+    failed = [result for result in results if result["status"] == "failed"]
+    for result in failed:
+        print(f"[FAIL] Visual change in '{result['name']}': {result['reason']}"
+              + (f" (diff: {result['diff']})" if result["diff"] else ""))
+    elapsed = time.perf_counter() - start
+    print(f"[INFO] Visual check: {len(results)} images, {len(failed)} failed, "
+          f"{sum(result['status'] == 'new' for result in results)} new baselines in {elapsed:.2f}s")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare screenshots with their visual baselines.")
+    parser.add_argument("screenshots_dir", nargs="?", default="screenshots")
+    parser.add_argument("--baselines", default=BASELINES_DIR, help="Directory of baseline images")
+    parser.add_argument("--masks", default=None, help="CSV file with ignore regions (name,x,y,width,height)")
+    parser.add_argument("--update", action="store_true", help="Accept changed screenshots as the new baselines")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args(argv)
+    failed = check_screenshots(args.screenshots_dir, args.baselines, masks_file=args.masks,
+                               update=args.update, workers=args.workers)
+    raise SystemExit(1 if failed and not args.update else 0)
+
+
+if __name__ == "__main__":
+    main()
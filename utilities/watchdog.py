@@ -0,0 +1,181 @@
+import csv
+import os
+import time
+from utilities.lazy import LazyImport
+
+psutil = LazyImport("psutil")
+
+
+def driver_processes(driver):
+    """
+    Returns the chromedriver process of a local session and all of its descendants (the browser processes).
+
+    Returns:
+        list: psutil.Process objects, empty for remote sessions or when the driver has already exited.
+    """
+    return service_processes(getattr(driver, "service", None))
+
+
+def service_processes(service):
+    """
+    Returns the process of a chromedriver service and all of its descendants (empty when it isn't running).
+    """
+    process = getattr(service, "process", None)
+    if process is None:
+        return []
+    try:
+        root = psutil.Process(process.pid)
+        return [root] + root.children(recursive=True)
+    except psutil.Error:
+        return []
+
+
+class DriverHandle:
+    """
+    Stands in for the WebDriver and forwards everything to the current session, so the
+    session can be replaced (recycled) while fixtures and Actions keep their reference.
+    """
+
+    def __init__(self, start_driver):
+        """
+        Args:
+            start_driver (callable): Returns a new, ready-to-use WebDriver (browser started, base URL open).
+        """
+        self._start_driver = start_driver
+        self.driver = start_driver()
+        self.recycles = 0
+        self.closed = False  # set once the fixture has quit the session for good
+
+    def __getattr__(self, name):
+        if name == "driver":
+            raise AttributeError(name)
+        return getattr(self.driver, name)
+
+    def recycle(self, reason):
+        """
+        Quits the current session and starts a fresh one (never once the handle is closed).
+        """
+        if self.closed:
+            return
+        print(f"[INFO] Recycling the browser session: {reason}")
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"[WARN] Could not quit the old session cleanly: {e}")
+        self.driver = self._start_driver()
+        self.recycles += 1
+
+
+class ResourceWatchdog:
+    """
+    Samples the memory, CPU and open handles of the chromedriver and browser processes
+    between tests, and recycles the session when a limit is crossed.
+    """
+
+    def __init__(self, handle, recycle_every=0, max_rss_mb=0, max_windows=0):
+        """
+        Args:
+            handle (DriverHandle): The session to watch.
+            recycle_every (int): Recycle after this many tests (0 disables it).
+            max_rss_mb (float): Recycle when the processes use more memory than this (0 disables it).
+            max_windows (int): Recycle when more browser windows than this are open (0 disables it).
+        """
+        self.handle = handle
+        self.recycle_every = recycle_every
+        self.max_rss_mb = max_rss_mb
+        self.max_windows = max_windows
+        self.samples = []
+        self.tests_since_recycle = 0
+
+    def processes(self):
+        """
+        Returns the chromedriver process and all of its descendants (empty for remote sessions).
+        """
+        return driver_processes(self.handle.driver)
+
+    def sample(self, nodeid):
+        """
+        Records one point of the resource curve.
+
+        Returns:
+            dict: The sample (RSS in MB, cumulative CPU seconds, open handles, windows).
+        """
+        rss = cpu = handles = 0
+        processes = self.processes()
+        for process in processes:
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    times = process.cpu_times()
+                    cpu += times.user + times.system
+                    handles += process.num_handles() if psutil.WINDOWS else process.num_fds()
+            except psutil.Error:
+                continue
+        try:
+            windows = len(self.handle.driver.window_handles)
+        except Exception:
+            windows = -1
+        sample = {
+            "index": len(self.samples) + 1,
+            "timestamp": round(time.time(), 3),
+            "nodeid": nodeid,
+            "processes": len(processes),
+            "rss_mb": round(rss / 1024 / 1024, 1),
+            "cpu_seconds": round(cpu, 2),
+            "handles": handles,
+            "windows": windows,
+            "recycled": "",
+        }
+        self.samples.append(sample)
+        return sample
+
+    def after_test(self, nodeid):
+        """
+        Samples the resources after a test and recycles the session when needed.
+        Does nothing once the session has been torn down.
+
+        Returns:
+            str: The reason the session was recycled, or None.
+        """
+        if self.handle.closed:
+            return None
+        sample = self.sample(nodeid)
+        self.tests_since_recycle += 1
+        reason = None
+        if self.max_rss_mb and sample["rss_mb"] > self.max_rss_mb:
+            reason = f"browser memory {sample['rss_mb']} MB exceeds {self.max_rss_mb} MB"
+        elif self.max_windows and sample["windows"] > self.max_windows:
+            reason = f"{sample['windows']} windows open (limit {self.max_windows})"
+        elif sample["windows"] <= 0:
+            reason = "no usable browser window left"
+        elif self.recycle_every and self.tests_since_recycle >= self.recycle_every:
+            reason = f"{self.tests_since_recycle} tests since the last recycle"
+        if reason:
+            self.handle.recycle(reason)
+            sample["recycled"] = reason
+            self.tests_since_recycle = 0
+        return reason
+
+    def save_curve(self, csv_path):
+        """
+        Writes the resource curve of the run as CSV.
+        """
+        if not self.samples:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+        with open(csv_path, mode="w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(self.samples[0]))
+            writer.writeheader()
+            writer.writerows(self.samples)
+        return csv_path
+
+    def summary(self):
+        """
+        Returns:
+            str: One line describing the memory curve and the recycles of the run.
+        """
+        if not self.samples:
+            return "no samples"
+        rss = [sample["rss_mb"] for sample in self.samples]
+        return (f"{len(self.samples)} samples, browser RSS {rss[0]} MB first / {max(rss)} MB peak / {rss[-1]} MB last, "
+                f"{self.handle.recycles} recycle(s)")